@@ -2,6 +2,8 @@
 ASGI config for Key project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (e.g. uvicorn or daphne) so the long-lived
+/api/events/ stream does not tie up a worker per console.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
@@ -47,6 +47,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'backend.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -104,6 +105,20 @@ DATABASES = {
     }
 }
 
+# Heavy admin reads (student lists, entry logs, dashboard stats) go to this
+# replica when it is configured. For local testing point KEY_REPLICA_DB at a
+# second SQLite file and refresh it with `manage.py sync_replica`.
+REPLICA_DATABASE = 'replica'
+
+if os.environ.get('KEY_REPLICA_DB'):
+    DATABASES[REPLICA_DATABASE] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['KEY_REPLICA_DB'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['backend.routers.ReadReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -155,10 +170,94 @@ EMAIL_HOST_USER = 'your_email@example.com'
 EMAIL_HOST_PASSWORD = 'your_password'
 DEFAULT_FROM_EMAIL = 'noreply@university.edu'
 
+# Repeat scans of the same card at the same gate inside this window
+# (in seconds) are answered from memory instead of logging another entry.
+# Set SCAN_DEBOUNCE_CACHE to a cache alias to share the window across workers.
+SCAN_DEBOUNCE_SECONDS = 5
+SCAN_DEBOUNCE_MAX_STUDENTS = 10000
+SCAN_DEBOUNCE_CACHE = None
+
+# Gates named in scan payloads are resolved through a small in-process cache
+GATE_CACHE_SIZE = 1024
+GATE_CACHE_SECONDS = 300
+
+# The first scan of a lost card emails the student immediately; further scans
+# within this many seconds are sent as one digest when the window closes.
+LOST_CARD_ALERT_WINDOW_SECONDS = 300
+LOST_CARD_ALERT_MAX_STUDENTS = 10000
+LOST_CARD_ALERT_MAX_PENDING = 50
+LOST_CARD_ALERT_CACHE = None
+
+# Responses to requests sent with an Idempotency-Key header are replayed to
+# retries for this long. Completed responses are also kept in a per-process
+# LRU of IDEMPOTENCY_CACHE_SIZE entries. A claim older than
+# IDEMPOTENCY_LOCK_SECONDS is assumed abandoned by a crashed worker.
+IDEMPOTENCY_KEY_TTL_SECONDS = 24 * 60 * 60
+IDEMPOTENCY_CACHE_SIZE = 10000
+IDEMPOTENCY_LOCK_SECONDS = 60
+
+# Largest scan list accepted by verify-qr/batch/ from offline gate clients
+VERIFY_BATCH_MAX_SCANS = 200
+
+# Server-side decoding of photos from camera-only gates (/api/verify-qr/image/):
+# decoder threads, images queued or decoding at once before new ones are
+# turned away, and the per-image wait before a decode is reported as timed out.
+# Images are also refused by pixel count, read from the header before decoding
+QR_DECODE_WORKERS = 4
+QR_DECODE_MAX_PENDING = 32
+QR_DECODE_TIMEOUT_SECONDS = 2.0
+QR_DECODE_MAX_IMAGES = 10
+QR_DECODE_MAX_IMAGE_BYTES = 5 * 1024 * 1024
+QR_DECODE_MAX_IMAGE_PIXELS = 24_000_000
+
+# Live gate events for security consoles (/api/events/): events buffered
+# per subscriber before the oldest are dropped, and the idle keepalive interval
+EVENT_STREAM_BUFFER_SIZE = 100
+EVENT_STREAM_KEEPALIVE_SECONDS = 15
+
+# Sync cursors lag this far behind the clock, so changes committed late by a
+# slow or lock-blocked write are re-sent rather than missed. Keep it above the
+# longest write transaction (including the database busy timeout).
+TODO_SYNC_CURSOR_MARGIN_SECONDS = 60
+
+# Largest operations list accepted by the todo batch endpoint (/todo/batch/)
+TODO_BATCH_MAX_OPERATIONS = 500
+
+# send_task_reminders emails open tasks this many minutes before their deadline
+TODO_REMINDER_LEAD_MINUTES = 60
+
+# Note revisions are stored as compressed deltas with a full snapshot every
+# this many revisions, bounding how many deltas a rebuild applies
+NOTE_SNAPSHOT_INTERVAL = 20
+
+# How long rows are kept before purge_expired_data deletes them, keyed by
+# model label: rows whose `field` is more than `days` old, optionally limited
+# by `filter` lookups. Set an entry to None to keep that model forever.
+# Tombstones must outlive any sync cursor a client may still hold; older
+# cursors get a full sync instead of a delta.
+RETENTION_POLICIES = {
+    'backend.EntryLog': {'field': 'timestamp', 'days': 730},
+    'backend.LostCardScan': {'field': 'timestamp', 'days': 730},
+    'backend.IdempotencyRecord': {'field': 'expires_at', 'days': 0},
+    'todo.Task': {'field': 'updated_at', 'days': 365, 'filter': {'completed': True}},
+    'todo.Note': None,
+    'todo.Tombstone': {'field': 'deleted_at', 'days': 90},
+}
+
+# Requests slower than this are written to the 'backend.performance' log
+SLOW_REQUEST_THRESHOLD_MS = 500
+
 # Media settings for storing QR codes
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# How QR images are handed to the front proxy after the ownership check:
+# None streams them from Django (development), 'nginx' sets X-Accel-Redirect
+# to MEDIA_ACCEL_REDIRECT_PREFIX + name (an `internal` location aliased to
+# MEDIA_ROOT), 'xsendfile' sets X-Sendfile for Apache or lighttpd.
+MEDIA_SENDFILE_BACKEND = None
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
@@ -166,8 +265,26 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # Reverse proxies in front of Django whose X-Forwarded-For entries are
+    # trusted. With 0 the client IP is REMOTE_ADDR and X-Forwarded-For is
+    # ignored; set it to 1 behind a single nginx. Left unset, DRF would key
+    # throttles on the whole client-supplied header.
+    'NUM_PROXIES': 0,
+    # Token-bucket rates for backend.throttling: verify-qr per authenticated
+    # device account, login and refresh per client IP address
+    'DEFAULT_THROTTLE_RATES': {
+        'verify_qr': '120/min',
+        'verify_qr_batch': '30/min',
+        'verify_qr_image': '60/min',
+        'auth_login': '10/min',
+        'auth_refresh': '30/min',
+    },
 }
 
+# Cache holding the throttle buckets; point it at a shared backend (e.g.
+# Redis) so limits apply across workers rather than per process
+THROTTLE_CACHE = 'default'
+
 # JWT settings
 
 # SIMPLE_JWT = {
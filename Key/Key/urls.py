@@ -18,12 +18,13 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
-from rest_framework_simplejwt.views import TokenRefreshView
 from backend.views import (
     CustomTokenObtainPairView,
+    ThrottledTokenRefreshView,
     StudentRegistrationView,
     LogoutView,
     UserDetailView,
+    QRCodeMediaView,
 )
 
 urlpatterns = [
@@ -31,7 +32,7 @@ urlpatterns = [
     
     # Authentication URLs
     path('auth/login/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('auth/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('auth/refresh/', ThrottledTokenRefreshView.as_view(), name='token_refresh'),
     path('auth/register/', StudentRegistrationView.as_view(), name='register'),
     path('auth/logout/', LogoutView.as_view(), name='logout'),
     path('auth/user/', UserDetailView.as_view(), name='user_detail'),
@@ -39,6 +40,8 @@ urlpatterns = [
     path('api/', include('backend.urls')),
     path('todo/', include('todo.urls')),
     
+    # QR images go through an ownership check before the proxy sends them
+    path(f"{settings.MEDIA_URL.strip('/')}/qr_codes/<path:path>", QRCodeMediaView.as_view(), name='qr_code_media'),
 ]
 
 if settings.DEBUG:
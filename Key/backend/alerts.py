@@ -0,0 +1,143 @@
+import heapq
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from .cache import BoundedTTLCache
+from .notifications import queue_mail
+
+logger = logging.getLogger(__name__)
+
+
+class LostCardAlertCoalescer:
+    """
+    Rate-limits lost-card emails per student. The first scan of a lost card
+    alerts the student straight away and opens a window; further scans in
+    the window are collected and sent as a single digest when it closes.
+
+    Window state lives in a bounded in-process LRU, or in a shared Django
+    cache when LOST_CARD_ALERT_CACHE names a cache alias. Windows opened by
+    this process are closed by a single flusher thread that sleeps until
+    the earliest deadline in a heap.
+    """
+
+    key_prefix = 'lost-card-alert'
+
+    def __init__(self, window, max_students, max_pending, cache_alias=None):
+        self.window = window
+        self.max_pending = max_pending
+        self.cache_alias = cache_alias
+        # Entries outlive the window so the flush always finds them
+        self._local = BoundedTTLCache(maxsize=max_students, ttl=window * 2)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        # (monotonic deadline, student id, email) of each open window
+        self._deadlines = []
+        self._flusher = None
+
+    def _key(self, student_id):
+        return f'{self.key_prefix}:{student_id}'
+
+    def _open(self, student_id, state):
+        """Atomically open a window; False if one is already open"""
+        if self.cache_alias:
+            return caches[self.cache_alias].add(self._key(student_id), state, timeout=self.window * 2)
+        if self._local.get(self._key(student_id)) is not None:
+            return False
+        self._local.set(self._key(student_id), state)
+        return True
+
+    def _load(self, student_id):
+        if self.cache_alias:
+            return caches[self.cache_alias].get(self._key(student_id))
+        return self._local.get(self._key(student_id))
+
+    def _store(self, student_id, state):
+        if self.cache_alias:
+            caches[self.cache_alias].set(self._key(student_id), state, timeout=self.window * 2)
+        else:
+            self._local.set(self._key(student_id), state)
+
+    def _pop(self, student_id):
+        if self.cache_alias:
+            cache = caches[self.cache_alias]
+            state = cache.get(self._key(student_id))
+            cache.delete(self._key(student_id))
+            return state
+        return self._local.pop(self._key(student_id))
+
+    def record(self, student, location):
+        """Register a lost-card scan and send or defer the email"""
+        now = timezone.now()
+        with self._lock:
+            opened = self._open(student.id, {'pending': [], 'overflow': 0})
+            if not opened:
+                state = self._load(student.id) or {'pending': [], 'overflow': 0}
+                if len(state['pending']) < self.max_pending:
+                    state['pending'].append((location, now))
+                else:
+                    state['overflow'] += 1
+                self._store(student.id, state)
+                return
+
+        queue_mail([(
+            'Alert: Lost ID Card Used',
+            f'Your ID card that was reported as lost has been scanned at {location}. '
+            f'Please contact security immediately.',
+            [student.email],
+        )])
+        with self._wakeup:
+            heapq.heappush(self._deadlines, (time.monotonic() + self.window, student.id, student.email))
+            # Started lazily, and again if it did not survive a fork
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(target=self._run, name='lost-card-alerts', daemon=True)
+                self._flusher.start()
+            self._wakeup.notify()
+
+    def _run(self):
+        while True:
+            with self._wakeup:
+                while not self._deadlines or self._deadlines[0][0] > time.monotonic():
+                    self._wakeup.wait(self._deadlines[0][0] - time.monotonic() if self._deadlines else None)
+                due = []
+                while self._deadlines and self._deadlines[0][0] <= time.monotonic():
+                    due.append(heapq.heappop(self._deadlines))
+            for _, student_id, email in due:
+                try:
+                    self.flush(student_id, email)
+                except Exception:
+                    logger.exception('Could not send lost-card digest for student %s', student_id)
+
+    def flush(self, student_id, email):
+        """Close the window and send one digest for the scans it collected"""
+        with self._lock:
+            state = self._pop(student_id)
+        if not state or not (state['pending'] or state['overflow']):
+            return
+
+        lines = [
+            f' - {location} at {timezone.localtime(scanned_at):%Y-%m-%d %H:%M:%S}'
+            for location, scanned_at in state['pending']
+        ]
+        if state['overflow']:
+            lines.append(f" - and {state['overflow']} more")
+        count = len(state['pending']) + state['overflow']
+        queue_mail([(
+            'Alert: Lost ID Card Used Again',
+            f'Your ID card that was reported as lost was scanned {count} more time(s) '
+            f'after the first alert:\n' + '\n'.join(lines) +
+            '\nPlease contact security immediately.',
+            [email],
+        )])
+
+
+lost_card_alerts = LostCardAlertCoalescer(
+    window=getattr(settings, 'LOST_CARD_ALERT_WINDOW_SECONDS', 300),
+    max_students=getattr(settings, 'LOST_CARD_ALERT_MAX_STUDENTS', 10000),
+    max_pending=getattr(settings, 'LOST_CARD_ALERT_MAX_PENDING', 50),
+    cache_alias=getattr(settings, 'LOST_CARD_ALERT_CACHE', None),
+)
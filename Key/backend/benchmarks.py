@@ -0,0 +1,319 @@
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connections
+from django.test import Client
+from django.test.utils import (
+    override_settings,
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import Student, EntryLog, LostCardScan, Gate
+
+User = get_user_model()
+
+BENCH_PREFIX = 'BENCH'
+# Returned by scenario calls for 429 responses, which measure the rate
+# limiter rather than the server and are reported apart from the latencies
+THROTTLED = 'throttled'
+BENCH_PASSWORD = 'bench-password-2127'
+LOCATIONS = ['Main Gate', 'North Gate', 'Library', 'Hostel A', 'Hostel B', 'Sports Complex']
+
+
+@contextmanager
+def throwaway_database():
+    """
+    Run the block against freshly migrated test databases and a temporary
+    MEDIA_ROOT, torn down afterwards.
+    """
+    setup_test_environment()
+    workdir = tempfile.mkdtemp(prefix='benchmark-')
+    # SQLite's shared in-memory test database locks whole tables between
+    # threads, so concurrent load needs an on-disk test database
+    default = connections['default'].settings_dict
+    if default['ENGINE'] == 'django.db.backends.sqlite3':
+        default['TEST']['NAME'] = os.path.join(workdir, 'benchmark.sqlite3')
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        # Measure the server, not the rate limiter
+        rest_framework = dict(settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES={})
+        with override_settings(MEDIA_ROOT=os.path.join(workdir, 'media'), REST_FRAMEWORK=rest_framework):
+            yield
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+def percentile(sorted_samples, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_samples:
+        return None
+    index = min(len(sorted_samples) - 1, max(0, int(round(fraction * len(sorted_samples))) - 1))
+    return sorted_samples[index]
+
+
+def summarize(samples, errors, elapsed, throttled=0):
+    """Reduce per-request latencies (seconds) to the figures we compare between releases"""
+    ordered = sorted(samples)
+    to_ms = lambda value: None if value is None else round(value * 1000, 3)
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'throttled': throttled,
+        'elapsed_s': round(elapsed, 3),
+        'rps': round(len(samples) / elapsed, 2) if elapsed else None,
+        'mean_ms': to_ms(sum(ordered) / len(ordered)) if ordered else None,
+        'p50_ms': to_ms(percentile(ordered, 0.50)),
+        'p90_ms': to_ms(percentile(ordered, 0.90)),
+        'p95_ms': to_ms(percentile(ordered, 0.95)),
+        'p99_ms': to_ms(percentile(ordered, 0.99)),
+        'max_ms': to_ms(ordered[-1]) if ordered else None,
+    }
+
+
+def run_load(call, requests, concurrency):
+    """
+    Invoke call(i) `requests` times from `concurrency` threads and summarize
+    the latencies. call returns False for responses the scenario treats as
+    errors and THROTTLED for 429s, which are counted but left out of the
+    latency figures.
+    """
+    samples = []
+    errors = 0
+    throttled = 0
+    lock = threading.Lock()
+
+    def worker(i):
+        nonlocal errors, throttled
+        started = time.perf_counter()
+        ok = call(i)
+        duration = time.perf_counter() - started
+        with lock:
+            if ok == THROTTLED:
+                throttled += 1
+                return
+            samples.append(duration)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(requests)))
+    return summarize(samples, errors, time.perf_counter() - started, throttled)
+
+
+def _base36(number):
+    digits = ''
+    while True:
+        number, remainder = divmod(number, 36)
+        digits = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'[remainder] + digits
+        if not number:
+            return digits
+
+
+class InProcessTransport:
+    """Drives the API through Django's test client, one client per thread"""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def request(self, method, path, data=None, token=None):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = Client()
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        if method == 'GET':
+            response = client.get(path, data or {}, **headers)
+        else:
+            response = client.post(path, json.dumps(data or {}), content_type='application/json', **headers)
+        return response.status_code, response.content
+
+
+class HttpTransport:
+    """Drives a running server over HTTP"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, path, data=None, token=None):
+        url = self.base_url + path
+        body = None
+        headers = {'Content-Type': 'application/json'}
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        if method == 'GET' and data:
+            url += '?' + urllib.parse.urlencode(data)
+        elif method != 'GET':
+            body = json.dumps(data or {}).encode()
+        req = urllib.request.Request(url, data=body, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(req, timeout=30) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+
+class Dataset:
+    """Seeded users, students and tokens the scenarios draw from"""
+
+    def __init__(self, students=5000, entries=50000, lost_scans=2000, login_users=10, seed=2127):
+        self.sizes = {
+            'students': students,
+            'entries': entries,
+            'lost_scans': lost_scans,
+            'login_users': login_users,
+        }
+        self.random = random.Random(seed)
+        self.run_id = f'{BENCH_PREFIX}-{int(time.time())}'
+        # Admission numbers are limited to 20 characters, so they carry a
+        # short tag (e.g. BNT3K2XC) instead of the full run id
+        self.tag = 'BN' + _base36(int(time.time()))
+
+    def seed(self):
+        rnd = self.random
+        password = make_password(BENCH_PASSWORD)
+
+        self.admin = User.objects.create(
+            username=f'{self.run_id}-admin', password=password,
+            is_staff=True, is_admin=True,
+        )
+        self.security = User.objects.create(
+            username=f'{self.run_id}-gate', password=password, is_security=True,
+        )
+        self.login_users = User.objects.bulk_create([
+            User(username=f'{self.run_id}-user{i}', password=password, is_student=True)
+            for i in range(self.sizes['login_users'])
+        ])
+
+        # Mostly active cards with a realistic share of lost and expired ones
+        statuses = ['active'] * 90 + ['lost'] * 5 + ['expired'] * 3 + ['deactivated'] * 2
+        students = []
+        for i in range(self.sizes['students']):
+            admission_number = f'{self.tag}-{i:06d}'
+            students.append(Student(
+                name=f'Bench Student {i}',
+                email=f'{admission_number.lower()}@bench.invalid',
+                admission_number=admission_number,
+                qr_code=f'qr_codes/qr_{admission_number}.png',
+                status=rnd.choice(statuses),
+            ))
+        Student.objects.bulk_create(students, batch_size=1000)
+        self.student_ids = [str(s.id) for s in students]
+
+        gates = []
+        self.created_gate_ids = []
+        for name in LOCATIONS:
+            gate, created = Gate.objects.get_or_create(name=name)
+            gates.append(gate)
+            if created:
+                self.created_gate_ids.append(gate.pk)
+        EntryLog.objects.bulk_create([
+            EntryLog(student=rnd.choice(students), gate=rnd.choice(gates))
+            for _ in range(self.sizes['entries'])
+        ], batch_size=1000)
+        LostCardScan.objects.bulk_create([
+            LostCardScan(student=rnd.choice(students), gate=rnd.choice(gates))
+            for _ in range(self.sizes['lost_scans'])
+        ], batch_size=1000)
+
+        self.admin_token = str(RefreshToken.for_user(self.admin).access_token)
+        self.security_token = str(RefreshToken.for_user(self.security).access_token)
+        self.refresh_tokens = [str(RefreshToken.for_user(u)) for u in self.login_users]
+
+    def cleanup(self):
+        """
+        Delete everything this run seeded or imported from a shared database.
+        Entry logs and lost-card scans go with their students. Imported
+        students' card images are left for sweep_qr_orphans.
+        """
+        Student.objects.filter(admission_number__startswith=self.tag).delete()
+        User.objects.filter(username__startswith=self.run_id).delete()
+        User.objects.filter(username__startswith=self.tag).delete()
+        Gate.objects.filter(pk__in=self.created_gate_ids).delete()
+
+
+def build_scenarios(transport, dataset, import_batch=20):
+    """Map scenario names to call(i) functions returning True on success"""
+    rnd = dataset.random
+
+    def ok(status_code, *allowed):
+        if status_code == 429:
+            return THROTTLED
+        return status_code < 400 or status_code in allowed
+
+    def verify_qr(i):
+        status_code, _ = transport.request('POST', '/api/verify-qr/', {
+            'qr_data': rnd.choice(dataset.student_ids),
+            'location': rnd.choice(LOCATIONS),
+        }, token=dataset.security_token)
+        # Lost and expired cards are denied with 403 by design
+        return ok(status_code, 403)
+
+    def login(i):
+        user = dataset.login_users[i % len(dataset.login_users)]
+        status_code, _ = transport.request('POST', '/auth/login/', {
+            'username': user.username,
+            'password': BENCH_PASSWORD,
+        })
+        return ok(status_code)
+
+    def refresh(i):
+        status_code, _ = transport.request('POST', '/auth/refresh/', {
+            'refresh': dataset.refresh_tokens[i % len(dataset.refresh_tokens)],
+        })
+        return ok(status_code)
+
+    def entry_logs(i):
+        status_code, _ = transport.request('GET', '/api/entry-logs/', token=dataset.admin_token)
+        return ok(status_code)
+
+    def dashboard_stats(i):
+        status_code, _ = transport.request('GET', '/api/admin/dashboard/stats/', token=dataset.admin_token)
+        return ok(status_code)
+
+    def bulk_import(i):
+        students = [
+            {
+                'name': f'Imported {i}-{j}',
+                'email': f'{dataset.run_id.lower()}-imp-{i}-{j}@bench.invalid',
+                'admission_number': f'{dataset.tag}-I{i * import_batch + j:07d}',
+            }
+            for j in range(import_batch)
+        ]
+        status_code, content = transport.request('POST', '/api/students/bulk-import/', {
+            'students': students,
+        }, token=dataset.admin_token)
+        result = ok(status_code)
+        if result is not True:
+            return result
+        # Rows that fail (e.g. "database is locked") are reported in a 200 body
+        try:
+            body = json.loads(content)
+        except ValueError:
+            return False
+        return body.get('created_count') == len(students) and not body.get('errors')
+
+    return {
+        'verify_qr': verify_qr,
+        'auth_login': login,
+        'auth_refresh': refresh,
+        'entry_logs': entry_logs,
+        'dashboard_stats': dashboard_stats,
+        'bulk_import': bulk_import,
+    }
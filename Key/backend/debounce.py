@@ -0,0 +1,87 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .cache import BoundedTTLCache
+
+
+class ScanDebouncer:
+    """
+    Remembers the response to a granted scan for a short window so that a
+    card held under the reader is not logged again for every decoded frame.
+
+    Entries are keyed by student and hold one response per gate. They
+    live in a bounded in-process LRU, or in a shared Django cache when
+    SCAN_DEBOUNCE_CACHE names a cache alias.
+    """
+
+    key_prefix = 'scan-debounce'
+
+    def __init__(self, window, maxsize, cache_alias=None):
+        self.window = window
+        self.cache_alias = cache_alias
+        self._local = BoundedTTLCache(maxsize=maxsize, ttl=window)
+
+    @property
+    def enabled(self):
+        return self.window > 0
+
+    def _cache_key(self, student_id):
+        return f'{self.key_prefix}:{student_id}'
+
+    def _load(self, student_id):
+        if self.cache_alias:
+            return caches[self.cache_alias].get(self._cache_key(student_id)) or {}
+        return self._local.get(str(student_id)) or {}
+
+    def _store(self, student_id, gates):
+        if self.cache_alias:
+            caches[self.cache_alias].set(self._cache_key(student_id), gates, timeout=self.window)
+        else:
+            self._local.set(str(student_id), gates)
+
+    def get(self, student_id, gate_id):
+        """Return the remembered response for a repeat scan, or None"""
+        if not self.enabled:
+            return None
+        entry = self._load(student_id).get(gate_id)
+        if entry is None:
+            return None
+        expires_at, response_data = entry
+        if expires_at <= time.time():
+            return None
+        return response_data
+
+    def remember(self, student_id, gate_id, response_data):
+        """Record a granted scan so repeats inside the window are answered from memory"""
+        if not self.enabled:
+            return
+        now = time.time()
+        gates = {
+            gate: entry for gate, entry in self._load(student_id).items()
+            if entry[0] > now
+        }
+        gates[gate_id] = (now + self.window, response_data)
+        self._store(student_id, gates)
+
+    def forget(self, student_id):
+        """Drop remembered scans, e.g. after the card status changed"""
+        if self.cache_alias:
+            caches[self.cache_alias].delete(self._cache_key(student_id))
+        else:
+            self._local.pop(str(student_id))
+
+    def forget_many(self, student_ids):
+        if self.cache_alias:
+            caches[self.cache_alias].delete_many([self._cache_key(pk) for pk in student_ids])
+        else:
+            for student_id in student_ids:
+                self._local.pop(str(student_id))
+
+
+scan_debouncer = ScanDebouncer(
+    window=getattr(settings, 'SCAN_DEBOUNCE_SECONDS', 5),
+    maxsize=getattr(settings, 'SCAN_DEBOUNCE_MAX_STUDENTS', 10000),
+    cache_alias=getattr(settings, 'SCAN_DEBOUNCE_CACHE', None),
+)
@@ -0,0 +1,101 @@
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from django.conf import settings
+
+
+class DecoderUnavailable(Exception):
+    """pyzbar, the zbar library or NumPy is not installed on this server"""
+
+
+class DecoderBusy(Exception):
+    """Every decode slot is taken; the caller should retry shortly"""
+
+
+class DecodeTimeout(Exception):
+    pass
+
+
+class ImageTooLarge(Exception):
+    """The image has more pixels than QR_DECODE_MAX_IMAGE_PIXELS"""
+
+
+def _decode(data):
+    try:
+        from generators.qrreader import decode_qr_codes_from_bytes
+    except ImportError as e:
+        raise DecoderUnavailable(str(e))
+    return decode_qr_codes_from_bytes(data)
+
+
+class QRDecoderPool:
+    """
+    Decodes uploaded photos on a small shared thread pool (pyzbar releases
+    the GIL while zbar runs). At most `max_pending` images may be queued or
+    running at once; past that, submit() fails fast with DecoderBusy instead
+    of letting a burst of photos pile up behind request workers.
+    """
+
+    def __init__(self, workers, max_pending, timeout, max_pixels):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_pixels = max_pixels
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='qr-decode')
+            return self._executor
+
+    def check_dimensions(self, data):
+        """
+        Reject images too large to decode from their header alone. A small,
+        highly compressed PNG can expand to hundreds of MB once decoded, and
+        only JPEG can be decoded straight to a reduced size.
+        """
+        from PIL import Image
+
+        try:
+            width, height = Image.open(io.BytesIO(data)).size
+        except Image.DecompressionBombError:
+            raise ImageTooLarge()
+        except Exception:
+            # Unreadable images are reported by the decoder
+            return
+        if width * height > self.max_pixels:
+            raise ImageTooLarge()
+
+    def submit(self, data):
+        self.check_dimensions(data)
+        if not self._slots.acquire(blocking=False):
+            raise DecoderBusy()
+        try:
+            future = self._get_executor().submit(_decode, data)
+        except Exception:
+            self._slots.release()
+            raise
+        # The slot is freed when decoding ends, even if the caller timed out
+        future.add_done_callback(lambda f: self._slots.release())
+        future.deadline = time.monotonic() + self.timeout
+        return future
+
+    def result(self, future):
+        """Wait until the image's deadline, `timeout` seconds after it was submitted"""
+        try:
+            return future.result(timeout=max(future.deadline - time.monotonic(), 0))
+        except TimeoutError:
+            future.cancel()
+            raise DecodeTimeout()
+
+
+decoder_pool = QRDecoderPool(
+    workers=getattr(settings, 'QR_DECODE_WORKERS', 4),
+    max_pending=getattr(settings, 'QR_DECODE_MAX_PENDING', 32),
+    timeout=getattr(settings, 'QR_DECODE_TIMEOUT_SECONDS', 2.0),
+    max_pixels=getattr(settings, 'QR_DECODE_MAX_IMAGE_PIXELS', 24_000_000),
+)
@@ -0,0 +1,87 @@
+import asyncio
+import itertools
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.utils import timezone
+
+
+class Subscription:
+    """
+    One console's view of the event stream. Events are kept in a bounded
+    buffer; when a slow consumer falls behind, the oldest events are dropped
+    instead of growing memory or blocking publishers.
+    """
+
+    def __init__(self, loop, maxsize, types=None):
+        self.loop = loop
+        self.types = set(types) if types else None
+        self.buffer = deque(maxlen=maxsize)
+        self.dropped = 0
+        self._ready = asyncio.Event()
+
+    def push(self, event):
+        """Called from any thread"""
+        if self.types is not None and event['type'] not in self.types:
+            return
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        self.buffer.append(event)
+        try:
+            self.loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            # The subscriber's event loop has already shut down
+            pass
+
+    async def next_batch(self, timeout):
+        """Wait up to `timeout` seconds and return all buffered events"""
+        if not self.buffer:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        events = []
+        while self.buffer:
+            events.append(self.buffer.popleft())
+        return events
+
+
+class EventBroker:
+    """In-process publish/subscribe hub for gate events"""
+
+    def __init__(self, buffer_size=100):
+        self.buffer_size = buffer_size
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def subscribe(self, types=None):
+        """Must be called from the event loop that will consume the events"""
+        subscription = Subscription(asyncio.get_running_loop(), self.buffer_size, types)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event_type, data):
+        """Fan an event out to every subscriber without blocking the caller"""
+        with self._lock:
+            if not self._subscriptions:
+                return
+            subscriptions = list(self._subscriptions)
+        event = {
+            'id': next(self._ids),
+            'type': event_type,
+            'time': timezone.now(),
+            'data': data,
+        }
+        for subscription in subscriptions:
+            subscription.push(event)
+
+
+broker = EventBroker(buffer_size=getattr(settings, 'EVENT_STREAM_BUFFER_SIZE', 100))
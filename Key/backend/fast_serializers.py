@@ -0,0 +1,123 @@
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from .models import Student
+
+# Shared DRF field used only for its to_representation, so timestamps come
+# out exactly as the ModelSerializers render them
+_datetime_field = serializers.DateTimeField()
+_date_field = serializers.DateField()
+
+
+class ValuesSerializer:
+    """
+    Read-only serializer that renders rows fetched with .values_list() into
+    the same JSON shape as a ModelSerializer, without building model
+    instances or running DRF field machinery per row.
+
+    `columns` lists (output name, queryset lookup) pairs in output order;
+    `to_<name>(value)` methods convert individual values where needed.
+    """
+    columns = ()
+
+    def __init__(self, context=None, fields=None):
+        self.context = context or {}
+        self.columns = [
+            (name, lookup) for name, lookup in self.columns
+            if not fields or name in fields
+        ]
+        self.names = [name for name, lookup in self.columns]
+        self.converters = [
+            (index, getattr(self, f'to_{name}'))
+            for index, name in enumerate(self.names)
+            if hasattr(self, f'to_{name}')
+        ]
+
+    def values(self, queryset):
+        """Restrict a queryset to the tuples this serializer renders"""
+        return queryset.values_list(*[lookup for name, lookup in self.columns])
+
+    def to_representation(self, row):
+        if self.converters:
+            row = list(row)
+            for index, convert in self.converters:
+                row[index] = convert(row[index])
+        return dict(zip(self.names, row))
+
+    def serialize(self, rows):
+        return [self.to_representation(row) for row in rows]
+
+
+class FastEntryLogSerializer(ValuesSerializer):
+    """Same output as EntryLogSerializer"""
+    columns = (
+        ('id', 'id'),
+        ('student', 'student_id'),
+        ('student_name', 'student__name'),
+        ('timestamp', 'timestamp'),
+        ('gate', 'gate_id'),
+        ('location', 'gate__name'),
+        ('successful', 'successful'),
+    )
+    to_timestamp = staticmethod(_datetime_field.to_representation)
+
+
+class FastLostCardScanSerializer(ValuesSerializer):
+    """Same output as LostCardScanSerializer"""
+    columns = (
+        ('id', 'id'),
+        ('student', 'student_id'),
+        ('student_name', 'student__name'),
+        ('timestamp', 'timestamp'),
+        ('gate', 'gate_id'),
+        ('location', 'gate__name'),
+    )
+    to_timestamp = staticmethod(_datetime_field.to_representation)
+
+
+class FastStudentSerializer(ValuesSerializer):
+    """Same output as StudentSerializer"""
+    columns = (
+        ('id', 'id'),
+        ('name', 'name'),
+        ('email', 'email'),
+        ('admission_number', 'admission_number'),
+        ('status', 'status'),
+        ('valid_until', 'valid_until'),
+        ('qr_code_url', 'qr_code'),
+        ('created_at', 'created_at'),
+    )
+    to_valid_until = staticmethod(_date_field.to_representation)
+    to_created_at = staticmethod(_datetime_field.to_representation)
+
+    def __init__(self, context=None, fields=None):
+        super().__init__(context, fields)
+        self.storage = Student._meta.get_field('qr_code').storage
+
+    def to_id(self, value):
+        return str(value)
+
+    def to_qr_code_url(self, name):
+        if name:
+            return self.context['request'].build_absolute_uri(self.storage.url(name))
+        return None
+
+
+class FastListMixin:
+    """
+    ListAPIView mixin that renders the list through `fast_serializer_class`,
+    fetching only the needed columns as tuples.
+    """
+    fast_serializer_class = None
+
+    def get_fast_serializer(self):
+        return self.fast_serializer_class(context=self.get_serializer_context())
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.get_fast_serializer()
+        queryset = serializer.values(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize(queryset))
@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from .cache import BoundedTTLCache
+from .models import Gate
+
+DEFAULT_GATE_NAME = 'Unknown'
+
+
+def normalize_gate_name(name):
+    """Collapse whitespace so 'Main  Gate ' and 'Main Gate' are the same gate"""
+    return ' '.join(str(name or '').split()) or DEFAULT_GATE_NAME
+
+
+class GateResolver:
+    """
+    Maps scan requests to Gate rows. A scanner account bound to a gate always
+    reports that gate; otherwise the free-form `location` in the payload is
+    normalized and looked up case-insensitively. Only admins may create a
+    gate by naming a new location; for anyone else an unknown location
+    resolves to the default gate, so callers cannot grow the table at will.
+    Lookups are cached in a bounded in-process LRU.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self._cache = BoundedTTLCache(maxsize=maxsize, ttl=ttl)
+
+    def for_request(self, request):
+        user = request.user
+        gate = getattr(user, 'gate', None)
+        if gate is not None:
+            return gate
+        can_create = bool(user.is_admin or user.is_staff)
+        return self.by_name(request.data.get('location'), create=can_create)
+
+    def by_name(self, name, create=True):
+        name = normalize_gate_name(name)
+        key = name.casefold()
+        gate = self._cache.get(key)
+        if gate is None:
+            gate = Gate.objects.filter(name__iexact=name).first()
+            if gate is None:
+                if not create and name != DEFAULT_GATE_NAME:
+                    # Not cached under `key`, so an admin can still add it
+                    return self.by_name(DEFAULT_GATE_NAME)
+                try:
+                    with transaction.atomic():
+                        gate = Gate.objects.create(name=name)
+                except IntegrityError:
+                    # Created concurrently by another request
+                    gate = Gate.objects.get(name__iexact=name)
+            self._cache.set(key, gate)
+        return gate
+
+    def clear(self):
+        self._cache.clear()
+
+
+gate_resolver = GateResolver(
+    maxsize=getattr(settings, 'GATE_CACHE_SIZE', 1024),
+    ttl=getattr(settings, 'GATE_CACHE_SECONDS', 300),
+)
@@ -0,0 +1,142 @@
+import functools
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from .cache import BoundedTTLCache
+from .models import IdempotencyRecord
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyStore:
+    """
+    Stored responses for Idempotency-Key requests. Completed responses are
+    served from a bounded in-process LRU in front of the IdempotencyRecord
+    table; the table row also acts as the lock that keeps two concurrent
+    requests with the same key from both running.
+    """
+
+    def __init__(self, ttl, maxsize, lock_timeout):
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self._cache = BoundedTTLCache(maxsize=maxsize, ttl=ttl)
+
+    def begin(self, scope, fingerprint):
+        """
+        Claim `scope` for a new request. Returns None when the caller should
+        run the request, else a stored (fingerprint, status_code, body)
+        tuple; status_code is None while the first request is in progress.
+        """
+        cached = self._cache.get(scope)
+        if cached is not None:
+            return cached
+
+        now = timezone.now()
+        try:
+            with transaction.atomic():
+                IdempotencyRecord.objects.create(
+                    scope=scope,
+                    fingerprint=fingerprint,
+                    expires_at=now + timedelta(seconds=self.ttl),
+                )
+            return None
+        except IntegrityError:
+            pass
+
+        record = IdempotencyRecord.objects.filter(scope=scope).first()
+        if record is None:
+            # Deleted between the insert and the read; let the caller retry
+            return (fingerprint, None, '')
+        stale_lock = record.status_code is None and record.created_at <= now - timedelta(seconds=self.lock_timeout)
+        if record.expires_at <= now or stale_lock:
+            # Take over an expired record, or a lock left by a crashed worker
+            claimed = IdempotencyRecord.objects.filter(pk=record.pk, created_at=record.created_at).update(
+                fingerprint=fingerprint,
+                status_code=None,
+                response_body='',
+                created_at=now,
+                expires_at=now + timedelta(seconds=self.ttl),
+            )
+            return None if claimed else (fingerprint, None, '')
+
+        stored = (record.fingerprint, record.status_code, record.response_body)
+        if record.status_code is not None:
+            self._cache.set(scope, stored, ttl=(record.expires_at - now).total_seconds())
+        return stored
+
+    def complete(self, scope, status_code, body):
+        IdempotencyRecord.objects.filter(scope=scope).update(status_code=status_code, response_body=body)
+        record = IdempotencyRecord.objects.filter(scope=scope).values_list('fingerprint', 'expires_at').first()
+        if record is not None:
+            fingerprint, expires_at = record
+            ttl = (expires_at - timezone.now()).total_seconds()
+            self._cache.set(scope, (fingerprint, status_code, body), ttl=ttl)
+
+    def abandon(self, scope):
+        """Release the claim so a retry runs the request again"""
+        IdempotencyRecord.objects.filter(scope=scope, status_code__isnull=True).delete()
+
+
+store = IdempotencyStore(
+    ttl=getattr(settings, 'IDEMPOTENCY_KEY_TTL_SECONDS', 24 * 60 * 60),
+    maxsize=getattr(settings, 'IDEMPOTENCY_CACHE_SIZE', 10000),
+    lock_timeout=getattr(settings, 'IDEMPOTENCY_LOCK_SECONDS', 60),
+)
+
+
+def idempotent(handler):
+    """
+    Decorator for APIView handlers. A request carrying an Idempotency-Key
+    header runs once per user and key; retries get the stored response
+    replayed without the handler running again. Server errors are not
+    stored, so those requests can be retried.
+    """
+    @functools.wraps(handler)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return handler(self, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response({"error": f"{HEADER} must be at most {MAX_KEY_LENGTH} characters"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        user_id = request.user.pk if request.user.is_authenticated else ''
+        scope = hashlib.sha256(f'{user_id}:{key}'.encode()).hexdigest()
+        fingerprint = hashlib.sha256(
+            request.method.encode() + b' ' + request.path.encode() + b'\n' + request.body
+        ).hexdigest()
+
+        stored = store.begin(scope, fingerprint)
+        if stored is not None:
+            stored_fingerprint, status_code, body = stored
+            if stored_fingerprint != fingerprint:
+                return Response({"error": f"{HEADER} was already used for a different request"},
+                                status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+            if status_code is None:
+                return Response({"error": f"A request with this {HEADER} is still being processed"},
+                                status=status.HTTP_409_CONFLICT)
+            response = Response(json.loads(body), status=status_code)
+            response['Idempotent-Replayed'] = 'true'
+            return response
+
+        try:
+            response = handler(self, request, *args, **kwargs)
+        except Exception:
+            store.abandon(scope)
+            raise
+        if response.status_code >= 500:
+            store.abandon(scope)
+        else:
+            store.complete(scope, response.status_code, json.dumps(response.data, cls=JSONEncoder))
+        return response
+
+    return wrapper
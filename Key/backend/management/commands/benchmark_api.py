@@ -0,0 +1,105 @@
+import json
+import platform
+import time
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.benchmarks import (
+    Dataset,
+    HttpTransport,
+    InProcessTransport,
+    build_scenarios,
+    run_load,
+    throwaway_database,
+)
+
+SCENARIOS = ['verify_qr', 'auth_login', 'auth_refresh', 'entry_logs', 'dashboard_stats', 'bulk_import']
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a realistic dataset and drive concurrent load against the API hot '
+        'paths, writing latency percentiles and throughput to a JSON file. Runs '
+        'in-process against a throwaway test database unless --url is given, in '
+        'which case the configured database is seeded with BENCH-* records that '
+        'are deleted afterwards (unless --keep-data). The target server should '
+        'run with relaxed throttle rates; 429 responses are reported separately.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help='Base URL of a running server, e.g. http://127.0.0.1:8000')
+        parser.add_argument('--scenario', action='append', choices=SCENARIOS,
+                            help='Scenario to run (repeatable, default: all)')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per scenario')
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--students', type=int, default=5000)
+        parser.add_argument('--entries', type=int, default=50000)
+        parser.add_argument('--lost-scans', type=int, default=2000)
+        parser.add_argument('--output', default='benchmark_results.json')
+        parser.add_argument('--keep-data', action='store_true',
+                            help='With --url, leave the seeded records in the database')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--requests and --concurrency must be positive')
+
+        if options['url']:
+            results = self.run(options, HttpTransport(options['url']))
+        else:
+            results = self.run_in_process(options)
+
+        with open(options['output'], 'w') as f:
+            json.dump(results, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def run_in_process(self, options):
+        with throwaway_database():
+            return self.run(options, InProcessTransport())
+
+    def run(self, options, transport):
+        dataset = Dataset(
+            students=options['students'],
+            entries=options['entries'],
+            lost_scans=options['lost_scans'],
+        )
+        self.stdout.write(f"Seeding {options['students']} students and {options['entries']} entries...")
+        dataset.seed()
+        try:
+            return self.run_scenarios(options, transport, dataset)
+        finally:
+            # The throwaway database is dropped anyway; a real one is not
+            if options['url'] and not options['keep_data']:
+                self.stdout.write('Removing seeded records...')
+                dataset.cleanup()
+
+    def run_scenarios(self, options, transport, dataset):
+
+        scenarios = build_scenarios(transport, dataset)
+        results = {
+            'meta': {
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                'mode': 'http' if options['url'] else 'in-process',
+                'url': options['url'],
+                'requests': options['requests'],
+                'concurrency': options['concurrency'],
+                'dataset': dataset.sizes,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+            },
+            'scenarios': {},
+        }
+
+        for name in options['scenario'] or SCENARIOS:
+            stats = run_load(scenarios[name], options['requests'], options['concurrency'])
+            results['scenarios'][name] = stats
+            self.stdout.write(
+                f"{name:16} {stats['rps']!s:>9} req/s  p50 {stats['p50_ms']!s:>8} ms  "
+                f"p99 {stats['p99_ms']!s:>8} ms  errors {stats['errors']}  throttled {stats['throttled']}"
+            )
+            if stats['throttled']:
+                self.stdout.write(self.style.WARNING(
+                    f'{name}: {stats["throttled"]} requests were rate limited; raise '
+                    "the server's DEFAULT_THROTTLE_RATES for benchmark runs"
+                ))
+        return results
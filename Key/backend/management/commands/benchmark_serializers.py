@@ -0,0 +1,85 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from backend.benchmarks import Dataset, throwaway_database
+from backend.fast_serializers import (
+    FastEntryLogSerializer,
+    FastLostCardScanSerializer,
+    FastStudentSerializer,
+)
+from backend.models import Student, EntryLog, LostCardScan
+from backend.serializers import EntryLogSerializer, LostCardScanSerializer, StudentSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the throughput of the values-based fast serializers with the '
+        'ModelSerializers, in rows per second on a seeded throwaway database. '
+        'That both render the same JSON is checked by the backend test suite.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=5000)
+        parser.add_argument('--entries', type=int, default=20000)
+        parser.add_argument('--lost-scans', type=int, default=5000)
+        parser.add_argument('--repeat', type=int, default=3, help='Best of N timed runs')
+        parser.add_argument('--output', default='serializer_benchmark.json')
+
+    def handle(self, *args, **options):
+        with throwaway_database():
+            Dataset(
+                students=options['students'],
+                entries=options['entries'],
+                lost_scans=options['lost_scans'],
+                login_users=1,
+            ).seed()
+            results = self.compare_all(options['repeat'])
+
+        with open(options['output'], 'w') as f:
+            json.dump(results, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def compare_all(self, repeat):
+        request = Request(RequestFactory().get('/'))
+        context = {'request': request}
+        cases = [
+            ('entry_logs', EntryLog.objects.select_related('student', 'gate').order_by('-timestamp'), EntryLogSerializer, FastEntryLogSerializer),
+            ('lost_card_scans', LostCardScan.objects.select_related('student', 'gate').order_by('-timestamp'), LostCardScanSerializer, FastLostCardScanSerializer),
+            ('students', Student.objects.order_by('pk'), StudentSerializer, FastStudentSerializer),
+        ]
+        results = {}
+
+        for name, queryset, model_serializer, fast_serializer in cases:
+            def model_path():
+                return model_serializer(queryset.all(), many=True, context=context).data
+
+            def fast_path():
+                serializer = fast_serializer(context=context)
+                return serializer.serialize(serializer.values(queryset.all()))
+
+            rows = queryset.count()
+            before = self.best_of(model_path, repeat)
+            after = self.best_of(fast_path, repeat)
+            results[name] = {
+                'rows': rows,
+                'model_serializer_rows_per_s': round(rows / before, 1),
+                'fast_serializer_rows_per_s': round(rows / after, 1),
+                'speedup': round(before / after, 2),
+            }
+            self.stdout.write(
+                f"{name:16} {rows:>7} rows  model {rows / before:>10.0f} rows/s  "
+                f"fast {rows / after:>10.0f} rows/s  x{before / after:.1f}"
+            )
+        return results
+
+    def best_of(self, func, repeat):
+        timings = []
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.transitions import DEFAULT_CHUNK_SIZE, TRANSITIONS, bulk_transition, filter_students
+
+
+class Command(BaseCommand):
+    help = 'Expire, deactivate or recover a filtered set of students in chunked updates.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=list(TRANSITIONS))
+        parser.add_argument('--status', help='Only students currently in this status')
+        parser.add_argument('--admission-prefix', help='Only admission numbers starting with this')
+        parser.add_argument('--created-before', help='ISO 8601 datetime')
+        parser.add_argument('--created-after', help='ISO 8601 datetime')
+        parser.add_argument('--all', action='store_true', help='Select every student')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--no-notify', action='store_true', help='Do not email the students')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the students affected')
+
+    def handle(self, *args, **options):
+        filters = {
+            key: options[option]
+            for key, option in (
+                ('status', 'status'),
+                ('admission_number_prefix', 'admission_prefix'),
+                ('created_before', 'created_before'),
+                ('created_after', 'created_after'),
+            )
+            if options[option]
+        }
+        if options['all']:
+            filters['all'] = True
+
+        try:
+            students = filter_students(filters)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options['dry_run']:
+            count = students.exclude(status=TRANSITIONS[options['action']]).count()
+            self.stdout.write(f"{count} students would be changed by '{options['action']}'")
+            return
+
+        started = time.monotonic()
+        updated = bulk_transition(
+            students,
+            options['action'],
+            chunk_size=options['chunk_size'],
+            notify=not options['no_notify'],
+            wait_for_mail=True,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated {updated} students in {time.monotonic() - started:.1f}s"
+        ))
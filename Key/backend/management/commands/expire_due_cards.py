@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from backend.models import Student
+from backend.transitions import DEFAULT_CHUNK_SIZE, bulk_transition
+
+
+class Command(BaseCommand):
+    help = (
+        'Expire every active card whose valid_until date has passed. Meant to '
+        'run periodically (e.g. nightly from cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Treat this date (YYYY-MM-DD) as today')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--no-notify', action='store_true', help='Do not email the students')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the cards that are due')
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        if options['date']:
+            today = parse_date(options['date'])
+            if today is None:
+                raise CommandError('--date must be YYYY-MM-DD')
+
+        # Served by the (status, valid_until) index
+        due = Student.objects.filter(status='active', valid_until__lt=today)
+
+        if options['dry_run']:
+            self.stdout.write(f'{due.count()} cards are due to expire')
+            return
+
+        started = time.monotonic()
+        expired = bulk_transition(
+            due,
+            'expire',
+            chunk_size=options['chunk_size'],
+            notify=not options['no_notify'],
+            wait_for_mail=True,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Expired {expired} cards in {time.monotonic() - started:.1f}s'
+        ))
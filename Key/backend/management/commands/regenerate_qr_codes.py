@@ -0,0 +1,92 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.qr import render_qr_png, write_atomic
+from backend.transitions import filter_students
+
+
+def _render(args):
+    return render_qr_png(*args)
+
+
+class Command(BaseCommand):
+    help = (
+        'Regenerate QR card images for a filtered set of students across a '
+        'process pool. Progress is checkpointed so an interrupted run can be '
+        'resumed with --resume.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--status', help='Only students in this status')
+        parser.add_argument('--admission-prefix', help='Only admission numbers starting with this')
+        parser.add_argument('--all', action='store_true', help='Select every student')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--chunk-size', type=int, default=200)
+        parser.add_argument('--checkpoint', default='qr_regeneration.checkpoint.json',
+                            help='File recording the last student processed')
+        parser.add_argument('--resume', action='store_true', help='Continue from the checkpoint file')
+
+    def handle(self, *args, **options):
+        filters = {}
+        if options['status']:
+            filters['status'] = options['status']
+        if options['admission_prefix']:
+            filters['admission_number_prefix'] = options['admission_prefix']
+        if options['all']:
+            filters['all'] = True
+        try:
+            students = filter_students(filters).order_by('pk')
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        checkpoint = {'last_pk': None, 'done': 0}
+        if options['resume']:
+            if not os.path.exists(options['checkpoint']):
+                raise CommandError(f"No checkpoint at {options['checkpoint']}")
+            with open(options['checkpoint']) as f:
+                checkpoint = json.load(f)
+            self.stdout.write(f"Resuming after {checkpoint['done']} students")
+
+        def pending():
+            if checkpoint['last_pk']:
+                return students.filter(pk__gt=checkpoint['last_pk'])
+            return students
+
+        total = checkpoint['done'] + pending().count()
+
+        started = time.monotonic()
+        done_this_run = 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            while True:
+                batch = list(pending().only('pk', 'name', 'admission_number', 'qr_code')[:options['chunk_size']])
+                if not batch:
+                    break
+
+                # Rendering is CPU bound and runs in the pool; files and rows
+                # are written here, one student at a time
+                images = pool.map(_render, [(str(s.id), s.name, s.admission_number) for s in batch])
+                for student, png in zip(batch, images):
+                    student.regenerate_qr_code(png, update_fields=['qr_code', 'updated_at'])
+
+                checkpoint['last_pk'] = str(batch[-1].pk)
+                checkpoint['done'] += len(batch)
+                done_this_run += len(batch)
+                write_atomic(os.path.abspath(options['checkpoint']), json.dumps(checkpoint).encode())
+
+                elapsed = time.monotonic() - started
+                rate = done_this_run / elapsed if elapsed else 0
+                eta = (total - checkpoint['done']) / rate if rate else 0
+                self.stdout.write(
+                    f"{checkpoint['done']}/{total} students  {rate:.1f}/s  ETA {eta:.0f}s"
+                )
+
+        # Finished cleanly, nothing left to resume
+        if os.path.exists(options['checkpoint']):
+            os.remove(options['checkpoint'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Regenerated {done_this_run} QR codes in {time.monotonic() - started:.1f}s'
+        ))
@@ -0,0 +1,95 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.models import Student
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete QR images under MEDIA_ROOT/qr_codes that no student references, '
+        'checking them against the database in batches, and report the bytes reclaimed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--min-age', type=int, default=3600,
+                            help='Skip files modified in the last N seconds (in-flight saves)')
+        parser.add_argument('--sleep', type=float, default=0,
+                            help='Pause between batches, in seconds')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be deleted')
+
+    def handle(self, *args, **options):
+        storage = Student._meta.get_field('qr_code').storage
+        try:
+            root = storage.path('qr_codes')
+        except NotImplementedError:
+            raise CommandError('sweep_qr_orphans only supports file system storage')
+        if not os.path.isdir(root):
+            self.stdout.write('No QR code directory to sweep')
+            return
+
+        self.cutoff = time.time() - options['min_age']
+        self.dry_run = options['dry_run']
+        self.scanned = self.deleted = self.reclaimed = 0
+
+        batch = []
+        for directory, dirnames, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, storage.location).replace(os.sep, '/')
+                batch.append((name, path))
+                if len(batch) >= options['batch_size']:
+                    self.sweep(batch)
+                    batch = []
+                    if options['sleep']:
+                        time.sleep(options['sleep'])
+        if batch:
+            self.sweep(batch)
+
+        verb = 'Would delete' if self.dry_run else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f'Scanned {self.scanned} files. {verb} {self.deleted} orphans, '
+            f'reclaiming {self.reclaimed} bytes ({self.reclaimed / 1024 / 1024:.1f} MiB)'
+        ))
+
+    def sweep(self, batch):
+        # One indexed lookup per batch instead of one query per file
+        referenced = set(
+            Student.objects.filter(qr_code__in=[name for name, path in batch])
+            .values_list('qr_code', flat=True)
+        )
+        self.scanned += len(batch)
+        candidates = []
+        for name, path in batch:
+            if name in referenced:
+                continue
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if stat.st_mtime > self.cutoff:
+                continue
+            candidates.append((name, path, stat.st_size))
+        if not candidates:
+            return
+
+        # A regenerate may have started pointing at one of these files since
+        # the lookup above; it touches the file first, so recheck both
+        referenced = set(
+            Student.objects.filter(qr_code__in=[name for name, path, size in candidates])
+            .values_list('qr_code', flat=True)
+        )
+        for name, path, size in candidates:
+            if name in referenced:
+                continue
+            if not self.dry_run:
+                try:
+                    if os.stat(path).st_mtime > self.cutoff:
+                        continue
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+            self.deleted += 1
+            self.reclaimed += size
@@ -0,0 +1,45 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.routers import replica_alias
+
+
+class Command(BaseCommand):
+    help = (
+        'Copy the primary SQLite database onto the replica file. Run with '
+        '--interval to emulate a lagging replica during local development.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0,
+                            help='Repeat the copy every N seconds')
+
+    def handle(self, *args, **options):
+        alias = replica_alias()
+        if alias is None:
+            raise CommandError('No replica database is configured (see REPLICA_DATABASE).')
+
+        primary = settings.DATABASES['default']
+        replica = settings.DATABASES[alias]
+        for config in (primary, replica):
+            if config['ENGINE'] != 'django.db.backends.sqlite3':
+                raise CommandError('sync_replica only works with SQLite databases; '
+                                   'use the database\'s own replication otherwise.')
+
+        while True:
+            started = time.monotonic()
+            source = sqlite3.connect(str(primary['NAME']))
+            target = sqlite3.connect(str(replica['NAME']))
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
+            self.stdout.write(f'Replica synced in {time.monotonic() - started:.2f}s')
+
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
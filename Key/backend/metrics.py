@@ -0,0 +1,80 @@
+import bisect
+import threading
+
+# Latency buckets in seconds and query-count buckets, Prometheus style
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    """Fixed-bucket histogram that keeps a running sum and count"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """Yield (upper bound, cumulative count) pairs ending with +Inf"""
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            yield bound, total
+
+
+class MetricsRegistry:
+    """In-process histograms keyed by metric name and label values"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, help_text, buckets):
+        self._metrics[name] = {'help': help_text, 'buckets': buckets, 'series': {}}
+
+    def observe(self, name, labels, value):
+        metric = self._metrics[name]
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            histogram = metric['series'].get(key)
+            if histogram is None:
+                histogram = metric['series'][key] = Histogram(metric['buckets'])
+            histogram.observe(value)
+
+    def clear(self):
+        with self._lock:
+            for metric in self._metrics.values():
+                metric['series'].clear()
+
+    def render(self):
+        """Serialize every histogram in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, metric in self._metrics.items():
+                lines.append(f"# HELP {name} {metric['help']}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in sorted(metric['series'].items()):
+                    labels = ','.join(f'{k}="{_escape(v)}"' for k, v in key)
+                    for bound, count in histogram.cumulative():
+                        le = '+Inf' if bound == float('inf') else repr(float(bound))
+                        lines.append(f'{name}_bucket{{{labels},le="{le}"}} {count}')
+                    lines.append(f'{name}_sum{{{labels}}} {histogram.sum}')
+                    lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = MetricsRegistry()
+registry.register('key_request_duration_seconds', 'Wall time per request by view.', DURATION_BUCKETS)
+registry.register('key_db_queries', 'Database queries per request by view.', COUNT_BUCKETS)
+registry.register('key_db_duration_seconds', 'Database time per request by view.', DURATION_BUCKETS)
+registry.register('key_render_duration_seconds', 'Response rendering time per request by view.', DURATION_BUCKETS)
@@ -0,0 +1,83 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .metrics import registry
+
+logger = logging.getLogger('backend.performance')
+
+
+class QueryRecorder:
+    """Database execute wrapper that counts queries and the time spent in them"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+class PerformanceMiddleware:
+    """
+    Records wall time, database query count and time, and response rendering
+    time for every request, aggregated per view into the in-process metrics
+    registry. Requests slower than SLOW_REQUEST_THRESHOLD_MS are logged.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_threshold = getattr(settings, 'SLOW_REQUEST_THRESHOLD_MS', 500) / 1000
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        request._render_duration = 0.0
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        match = getattr(request, 'resolver_match', None)
+        labels = {
+            'view': match.view_name if match and match.view_name else 'unresolved',
+            'method': request.method,
+        }
+        registry.observe('key_request_duration_seconds', labels, duration)
+        registry.observe('key_db_queries', labels, recorder.count)
+        registry.observe('key_db_duration_seconds', labels, recorder.duration)
+        registry.observe('key_render_duration_seconds', labels, request._render_duration)
+
+        if duration >= self.slow_threshold:
+            logger.warning(json.dumps({
+                'event': 'slow_request',
+                'view': labels['view'],
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'duration_ms': round(duration * 1000, 2),
+                'db_queries': recorder.count,
+                'db_ms': round(recorder.duration * 1000, 2),
+                'render_ms': round(request._render_duration * 1000, 2),
+            }))
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returns; time the renderer
+        started = time.perf_counter()
+
+        def record_render(rendered):
+            request._render_duration = time.perf_counter() - started
+
+        response.add_post_render_callback(record_render)
+        return response
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:36
+
+from django.db import migrations, models
+from django.db.utils import OperationalError
+
+
+# Trigram full-text index over student names and admission numbers. Rows are
+# keyed by a 63-bit hash of the student UUID and refreshed from Student.save().
+CREATE_SEARCH_INDEX = """
+    CREATE VIRTUAL TABLE backend_student_search USING fts5(
+        student_id UNINDEXED, name, admission_number, tokenize='trigram'
+    )
+"""
+
+
+def create_search_index(apps, schema_editor):
+    # FTS5 is SQLite only; other databases fall back to plain lookups
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        schema_editor.execute(CREATE_SEARCH_INDEX)
+    except OperationalError:
+        # SQLite built without FTS5 or the trigram tokenizer
+        return
+    Student = apps.get_model('backend', 'Student')
+    rows = [
+        (student_id.int >> 65, student_id.hex, name, admission_number)
+        for student_id, name, admission_number
+        in Student.objects.values_list('id', 'name', 'admission_number').iterator()
+    ]
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            "INSERT INTO backend_student_search(rowid, student_id, name, admission_number) "
+            "VALUES (%s, %s, %s, %s)",
+            rows,
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS backend_student_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0003_remove_user_status_student_status'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='student',
+            name='name',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0004_student_search'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='student',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
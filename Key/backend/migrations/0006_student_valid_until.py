@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0005_student_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='valid_until',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['status', 'valid_until'], name='student_status_valid_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:03
+
+import backend.qr
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0006_student_valid_until'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='student',
+            name='qr_code',
+            field=models.ImageField(blank=True, db_index=True, null=True, upload_to=backend.qr.qr_upload_to),
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:40
+
+from collections import Counter
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def normalize(location):
+    return ' '.join((location or '').split()) or 'Unknown'
+
+
+def backfill_gates(apps, schema_editor):
+    """Create one Gate per distinct location, folding case and whitespace variants"""
+    Gate = apps.get_model('backend', 'Gate')
+    models_with_location = [
+        apps.get_model('backend', 'EntryLog'),
+        apps.get_model('backend', 'LostCardScan'),
+    ]
+
+    # Count every spelling so each gate is named after its most common one
+    spellings = Counter()
+    for model in models_with_location:
+        for row in model.objects.values('location').annotate(n=models.Count('id')):
+            spellings[normalize(row['location'])] += row['n']
+
+    gates = {}
+    for name, _ in spellings.most_common():
+        key = name.casefold()
+        if key not in gates:
+            gates[key] = Gate.objects.create(name=name)
+
+    for model in models_with_location:
+        for location in model.objects.values_list('location', flat=True).distinct():
+            gate = gates[normalize(location).casefold()]
+            model.objects.filter(location=location).update(gate=gate)
+
+
+def restore_locations(apps, schema_editor):
+    for model_name in ('EntryLog', 'LostCardScan'):
+        model = apps.get_model('backend', model_name)
+        for gate_id, name in apps.get_model('backend', 'Gate').objects.values_list('id', 'name'):
+            model.objects.filter(gate_id=gate_id).update(location=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0007_sharded_qr_codes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Gate',
+            fields=[
+                ('id', models.SmallAutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('device', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='gate', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='entrylog',
+            name='gate',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='entries', to='backend.gate'),
+        ),
+        migrations.AddField(
+            model_name='lostcardscan',
+            name='gate',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='lost_scans', to='backend.gate'),
+        ),
+        migrations.RunPython(backfill_gates, restore_locations),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('backend', '0008_gate'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='entrylog',
+            name='gate',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='entries', to='backend.gate'),
+        ),
+        migrations.AlterField(
+            model_name='lostcardscan',
+            name='gate',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='lost_scans', to='backend.gate'),
+        ),
+        # Gives the column a default so reversing the removal can re-add it
+        migrations.AlterField(
+            model_name='lostcardscan',
+            name='location',
+            field=models.CharField(default='Unknown', max_length=100),
+        ),
+        migrations.RemoveField(
+            model_name='entrylog',
+            name='location',
+        ),
+        migrations.RemoveField(
+            model_name='lostcardscan',
+            name='location',
+        ),
+        migrations.AddIndex(
+            model_name='entrylog',
+            index=models.Index(fields=['gate', 'timestamp'], name='entrylog_gate_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lostcardscan',
+            index=models.Index(fields=['gate', 'timestamp'], name='lostscan_gate_time_idx'),
+        ),
+    ]
@@ -1,12 +1,11 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser
 import uuid
-import qrcode
-from io import BytesIO
-from django.core.files import File
-from PIL import Image, ImageDraw
 from django.conf import settings
-import os
+from django.utils import timezone
+from .debounce import scan_debouncer
+from .qr import qr_upload_to, render_qr_card, render_qr_png, save_qr_image
+from .search import index_student, unindex_student
 
 class User(AbstractUser):
     is_student = models.BooleanField(default=False)
@@ -22,63 +21,64 @@ class User(AbstractUser):
 class Student(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='student_profile', null=True, blank=True)
-    name = models.CharField(max_length=100)
+    name = models.CharField(max_length=100, db_index=True)
     email = models.EmailField(unique=True)
     admission_number = models.CharField(max_length=20, unique=True)
-    qr_code = models.ImageField(upload_to='qr_codes/', blank=True, null=True)
+    qr_code = models.ImageField(upload_to=qr_upload_to, blank=True, null=True, db_index=True)
     status = models.CharField(max_length=20, default='active', 
                              choices=[('active', 'Active'), ('deactivated', 'Deactivated'), ('lost', 'Lost'), ('expired', 'Expired')])
+    valid_until = models.DateField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Lets the expiry job find due cards without scanning every student
+            models.Index(fields=['status', 'valid_until'], name='student_status_valid_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.admission_number})"
 
+    @property
+    def is_past_due(self):
+        """True once the card's validity end date has passed"""
+        return self.valid_until is not None and self.valid_until < timezone.localdate()
+
     def save(self, *args, **kwargs):
         # Generate QR code on first save
         if not self.qr_code:
-            qr_image = self.generate_qr_code()
-
-            # Save the QR code image
-            qr_filename = f"qr_{self.admission_number}.png"
-            temp_stream = BytesIO()
-            qr_image.save(temp_stream, format='PNG')
-            temp_stream.seek(0)
-
-            # Save to model field
-            self.qr_code.save(qr_filename, File(temp_stream), save=False)
+            save_qr_image(self, render_qr_png(str(self.id), self.name, self.admission_number))
 
         super().save(*args, **kwargs)
 
-    def generate_qr_code(self):
-        # Data to encode in QR code - using the UUID as unique identifier
-        qr_data = str(self.id)
+        # Keep the full-text search row in step with name and admission number
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'name', 'admission_number'} & set(update_fields):
+            index_student(self)
 
-        # Create QR code instance
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_M,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(qr_data)
-        qr.make(fit=True)
+        # A status change must not be hidden behind a remembered scan
+        scan_debouncer.forget(self.id)
 
-        # Create an image from the QR Code
-        img = qr.make_image(fill_color="black", back_color="white").convert("RGB")
+    def delete(self, *args, **kwargs):
+        unindex_student(self)
+        return super().delete(*args, **kwargs)
 
-        # Create a canvas with padding
-        canvas = Image.new("RGB", (img.size[0] + 20, img.size[1] + 50), "white")
+    def regenerate_qr_code(self, png_bytes=None, update_fields=None):
+        """Replace the card image, deleting the old file once the row is saved"""
+        old_name = self.qr_code.name
+        if png_bytes is None:
+            png_bytes = render_qr_png(str(self.id), self.name, self.admission_number)
+        save_qr_image(self, png_bytes)
+        self.save(update_fields=update_fields)
 
-        # Add QR code to canvas
-        canvas.paste(img, (10, 10))  # Now works because both are in 'RGB' mode
+        if old_name and old_name != self.qr_code.name:
+            storage = self.qr_code.storage
+            transaction.on_commit(lambda: storage.delete(old_name))
 
-        # Add text with student details
-        draw = ImageDraw.Draw(canvas)
-        draw.text((10, img.size[1] + 15), f"Name: {self.name}", fill="black")
-        draw.text((10, img.size[1] + 30), f"ID: {self.admission_number}", fill="black")
-
-        return canvas
+    def generate_qr_code(self):
+        # Data to encode in QR code - using the UUID as unique identifier
+        return render_qr_card(str(self.id), self.name, self.admission_number)
 
     def report_lost(self):
         """Mark the student ID as lost"""
@@ -102,20 +102,61 @@ class Student(models.Model):
         return True
 
 
+class Gate(models.Model):
+    """An entry point where cards are scanned, optionally bound to a scanner account"""
+    id = models.SmallAutoField(primary_key=True)
+    name = models.CharField(max_length=100, unique=True)
+    device = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
+        null=True, blank=True, related_name='gate'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+
 class EntryLog(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='entries')
-    timestamp = models.DateTimeField(auto_now_add=True)
-    location = models.CharField(max_length=100, default='Main Gate')
+    # Defaults to now; gate clients replaying offline scans pass their own time
+    timestamp = models.DateTimeField(default=timezone.now, db_index=True)
+    gate = models.ForeignKey(Gate, on_delete=models.PROTECT, related_name='entries')
     successful = models.BooleanField(default=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['gate', 'timestamp'], name='entrylog_gate_time_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.student.name} entered at {self.timestamp}"
 
 
 class LostCardScan(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='lost_scans')
-    timestamp = models.DateTimeField(auto_now_add=True)
-    location = models.CharField(max_length=100)
+    timestamp = models.DateTimeField(default=timezone.now, db_index=True)
+    gate = models.ForeignKey(Gate, on_delete=models.PROTECT, related_name='lost_scans')
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['gate', 'timestamp'], name='lostscan_gate_time_idx'),
+        ]
     
     def __str__(self):
         return f"Lost card for {self.student.name} scanned at {self.timestamp}"
+
+
+class IdempotencyRecord(models.Model):
+    """
+    The stored response to a request made with an Idempotency-Key header.
+    A row with no status_code marks a request that is still being processed.
+    """
+    scope = models.CharField(max_length=64, unique=True)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"Idempotency record {self.scope[:12]}"
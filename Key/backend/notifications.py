@@ -0,0 +1,37 @@
+import logging
+import threading
+
+from django.conf import settings
+from django.core.mail import send_mass_mail
+
+logger = logging.getLogger(__name__)
+
+# Messages sent over a single SMTP connection per batch
+MAIL_BATCH_SIZE = 100
+
+
+def _deliver(messages):
+    for start in range(0, len(messages), MAIL_BATCH_SIZE):
+        try:
+            send_mass_mail(messages[start:start + MAIL_BATCH_SIZE], fail_silently=False)
+        except Exception:
+            # Continue with the next batch even if email fails
+            logger.exception('Failed to send notification batch')
+
+
+def queue_mail(messages):
+    """
+    Send (subject, message, recipient_list) tuples from a background thread,
+    batching them over shared SMTP connections. Returns the thread, or None
+    if there was nothing to send; short-lived processes must join() it, as
+    it is a daemon thread and dies with the process.
+    """
+    messages = [
+        (subject, message, settings.DEFAULT_FROM_EMAIL, recipients)
+        for subject, message, recipients in messages
+    ]
+    if not messages:
+        return
+    thread = threading.Thread(target=_deliver, args=(messages,), daemon=True)
+    thread.start()
+    return thread
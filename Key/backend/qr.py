@@ -0,0 +1,102 @@
+import hashlib
+import os
+import tempfile
+from io import BytesIO
+
+import qrcode
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageDraw
+
+
+def render_qr_card(qr_data, name, admission_number):
+    """Render the ID card image: the QR code with the student's name and ID underneath"""
+    # Create QR code instance
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_M,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(qr_data)
+    qr.make(fit=True)
+
+    # Create an image from the QR Code
+    img = qr.make_image(fill_color="black", back_color="white").convert("RGB")
+
+    # Create a canvas with padding
+    canvas = Image.new("RGB", (img.size[0] + 20, img.size[1] + 50), "white")
+
+    # Add QR code to canvas
+    canvas.paste(img, (10, 10))  # Now works because both are in 'RGB' mode
+
+    # Add text with student details
+    draw = ImageDraw.Draw(canvas)
+    draw.text((10, img.size[1] + 15), f"Name: {name}", fill="black")
+    draw.text((10, img.size[1] + 30), f"ID: {admission_number}", fill="black")
+
+    return canvas
+
+
+def render_qr_png(qr_data, name, admission_number):
+    """Render the ID card as PNG bytes. Safe to call from a worker process."""
+    stream = BytesIO()
+    render_qr_card(qr_data, name, admission_number).save(stream, format='PNG')
+    return stream.getvalue()
+
+
+def write_atomic(path, data):
+    """Write bytes so readers see either no file or the complete file"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        # mkstemp creates 0600 files; give them the mode uploads get so the
+        # front proxy can serve them (X-Accel-Redirect) as another user
+        os.chmod(temp_path, settings.FILE_UPLOAD_PERMISSIONS or 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def qr_upload_to(instance, filename):
+    """
+    Shard card images into two levels of subdirectories keyed on the file
+    name (a content hash), e.g. qr_codes/3f/a2/3fa2....png, so no single
+    directory grows without bound.
+    """
+    return f"qr_codes/{filename[:2]}/{filename[2:4]}/{filename}"
+
+
+def save_qr_image(student, png_bytes):
+    """
+    Store a rendered card under its content hash and point student.qr_code
+    at it. Identical content is only written once. The model row is not
+    saved. Returns the file name.
+    """
+    field = student.qr_code.field
+    storage = field.storage
+    digest = hashlib.sha256(png_bytes).hexdigest()
+    name = field.generate_filename(student, f"{digest}.png")
+
+    try:
+        path = storage.path(name)
+    except NotImplementedError:
+        # Remote storages write whole objects anyway
+        if not storage.exists(name):
+            name = storage.save(name, ContentFile(png_bytes), max_length=field.max_length)
+    else:
+        try:
+            # Reusing an existing file: refresh its mtime so sweep_qr_orphans,
+            # which leaves recently modified files alone, cannot delete it as
+            # an orphan while the student is being pointed back at it
+            os.utime(path)
+        except FileNotFoundError:
+            write_atomic(path, png_bytes)
+
+    student.qr_code.name = name
+    return name
@@ -0,0 +1,84 @@
+import time
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+DEFAULT_BATCH_SIZE = 500
+
+
+class RetentionPolicy:
+    """
+    Rows of `model` whose `field` is older than `days` (and that match the
+    optional `filter` lookups) are due for deletion. `field` should be
+    indexed so each batch is an index range scan.
+    """
+
+    def __init__(self, label, field, days, filter=None):
+        self.label = label
+        self.model = apps.get_model(label)
+        self.field = field
+        self.days = days
+        self.filters = filter or {}
+
+    def cutoff(self, now=None):
+        return (now or timezone.now()) - timedelta(days=self.days)
+
+    def expired(self, cutoff):
+        return self.model.objects.filter(**{f'{self.field}__lt': cutoff}, **self.filters)
+
+
+def load_policies(labels=None):
+    """Policies from RETENTION_POLICIES, skipping disabled (None) entries"""
+    configured = {
+        label: config
+        for label, config in getattr(settings, 'RETENTION_POLICIES', {}).items()
+        if config is not None
+    }
+    unknown = set(labels or ()) - set(configured)
+    if unknown:
+        raise ValueError(f"No retention policy for {', '.join(sorted(unknown))}")
+    return [
+        RetentionPolicy(label, **config)
+        for label, config in configured.items()
+        if not labels or label in labels
+    ]
+
+
+def retention_cutoff(label, now=None):
+    """Cutoff of the policy for `label`, or None if it has none"""
+    config = getattr(settings, 'RETENTION_POLICIES', {}).get(label)
+    if config is None:
+        return None
+    return (now or timezone.now()) - timedelta(days=config['days'])
+
+
+def purge(policy, cutoff, batch_size=DEFAULT_BATCH_SIZE, pause=0.0, on_batch=None):
+    """
+    Delete the rows `policy` selects as of `cutoff`, oldest first, in short
+    transactions of at most `batch_size` rows with `pause` seconds between
+    them so other writers (gate scans) are never locked out for long.
+    Models may define an `on_purge(pks)` classmethod, called in the same
+    transaction before the rows go. Returns the number of rows deleted.
+    """
+    model = policy.model
+    on_purge = getattr(model, 'on_purge', None)
+    queryset = policy.expired(cutoff).order_by(policy.field, 'pk')
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            pks = list(queryset.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                return deleted
+            if on_purge is not None:
+                on_purge(pks)
+            model.objects.filter(pk__in=pks).delete()
+        deleted += len(pks)
+        if on_batch is not None:
+            on_batch(len(pks))
+        if len(pks) < batch_size:
+            return deleted
+        if pause:
+            time.sleep(pause)
@@ -0,0 +1,63 @@
+import contextvars
+from contextlib import contextmanager
+
+from django.conf import settings
+
+# Per-request routing state: whether reads may use the replica, and whether
+# the request has already written to the primary.
+_routing = contextvars.ContextVar('replica_routing', default=None)
+
+
+def replica_alias():
+    """Return the configured replica alias, or None when there is no replica"""
+    alias = getattr(settings, 'REPLICA_DATABASE', None)
+    if alias and alias in settings.DATABASES:
+        return alias
+    return None
+
+
+@contextmanager
+def replica_reads():
+    """Route reads inside the block to the replica until something is written"""
+    token = _routing.set({'pinned': False})
+    try:
+        yield
+    finally:
+        _routing.reset(token)
+
+
+class ReadReplicaRouter:
+    """
+    Sends reads made inside replica_reads() to the replica database.
+    Any write pins the rest of the request to the primary so a view never
+    reads back stale data it has just written.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        if state is None or state['pinned']:
+            return None
+        return replica_alias()
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None:
+            state['pinned'] = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+
+class ReplicaReadMixin:
+    """Serve safe requests from the read replica when one is configured"""
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            return super().dispatch(request, *args, **kwargs)
+        with replica_reads():
+            return super().dispatch(request, *args, **kwargs)
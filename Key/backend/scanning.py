@@ -0,0 +1,150 @@
+import uuid
+
+from django.utils import timezone
+from rest_framework import status
+
+from .alerts import lost_card_alerts
+from .debounce import scan_debouncer
+from .events import broker
+from .models import EntryLog, LostCardScan, Student
+
+# What a gate did with a scan it answered locally (offline or from cache)
+ALLOW = 'allow'
+DENY = 'deny'
+DECISIONS = (ALLOW, DENY)
+
+
+def verify_scan(qr_data, gate, scanned_at=None, decision=None):
+    """
+    Decide whether the card in `qr_data` may pass `gate`, recording the
+    entry or lost-card scan and publishing the gate event. Returns the
+    (HTTP status, response data) pair VerifyQRCodeView answers with.
+
+    `scanned_at` backdates the log rows for scans a gate queued offline.
+    Those skip the debounce, which only knows about the current time; the
+    gate client already drops repeat frames before queueing.
+
+    `decision` is the ALLOW or DENY a gate already acted on for a queued
+    scan. The response still carries the backend's verdict, so the gate can
+    correct its cache, but EntryLog records whether the person actually
+    went through rather than what the backend would decide now.
+    """
+    location = gate.name
+    live = scanned_at is None
+    scanned_at = scanned_at or timezone.now()
+
+    try:
+        # Convert the QR data to UUID
+        student_uuid = uuid.UUID(str(qr_data))
+    except ValueError:
+        return status.HTTP_400_BAD_REQUEST, {
+            'status': 'error',
+            'message': 'Invalid QR code format'
+        }
+
+    # Answer repeat scans inside the debounce window from memory
+    if live:
+        duplicate = scan_debouncer.get(student_uuid, gate.id)
+        if duplicate is not None:
+            return status.HTTP_200_OK, duplicate
+
+    # Find the student
+    try:
+        student = Student.objects.get(id=student_uuid)
+    except Student.DoesNotExist:
+        broker.publish('scan.denied', {
+            'reason': 'not_found',
+            'qr_data': qr_data,
+            'gate': gate.id,
+            'location': location
+        })
+        return status.HTTP_404_NOT_FOUND, {
+            'status': 'error',
+            'message': 'Student not found'
+        }
+
+    student_data = {
+        'id': str(student.id),
+        'name': student.name,
+        'admission_number': student.admission_number
+    }
+
+    # Check if the card is reported as lost
+    if student.status == 'lost':
+        # Record the lost card scan
+        LostCardScan.objects.create(student=student, gate=gate, timestamp=scanned_at)
+        if decision == ALLOW:
+            EntryLog.objects.create(student=student, gate=gate, timestamp=scanned_at, successful=True)
+
+        # Alert the student, coalescing repeated scans into a digest
+        lost_card_alerts.record(student, location)
+
+        broker.publish('lostcard.scanned', {
+            'student': student_data,
+            'gate': gate.id,
+            'location': location
+        })
+        return status.HTTP_403_FORBIDDEN, {
+            'status': 'error',
+            'message': 'This ID card has been reported as lost',
+            'student': student_data
+        }
+
+    # Check if the card is expired, including past-due cards the
+    # expiry job has not reached yet
+    if student.status == 'expired' or student.is_past_due:
+        if decision is not None:
+            EntryLog.objects.create(
+                student=student,
+                gate=gate,
+                timestamp=scanned_at,
+                successful=decision == ALLOW
+            )
+        broker.publish('scan.denied', {
+            'reason': 'expired',
+            'student': student_data,
+            'gate': gate.id,
+            'location': location
+        })
+        return status.HTTP_403_FORBIDDEN, {
+            'status': 'error',
+            'message': 'This ID card has expired',
+            'student': student_data
+        }
+
+    # If card is active, log the entry
+    entry_log = EntryLog.objects.create(
+        student=student,
+        gate=gate,
+        timestamp=scanned_at,
+        successful=decision != DENY
+    )
+
+    response_data = {
+        'status': 'success',
+        'message': 'Access granted',
+        'student': student_data,
+        'entry': {
+            'id': entry_log.id,
+            'timestamp': entry_log.timestamp,
+            'successful': entry_log.successful,
+            'gate': gate.id,
+            'location': location
+        }
+    }
+    if live:
+        scan_debouncer.remember(student.id, gate.id, response_data)
+    if entry_log.successful:
+        broker.publish('entry.granted', {
+            'student': response_data['student'],
+            'entry': response_data['entry']
+        })
+    else:
+        # A valid card the gate turned away while it could not reach us
+        broker.publish('scan.denied', {
+            'reason': 'gate_decision',
+            'student': student_data,
+            'gate': gate.id,
+            'location': location
+        })
+    return status.HTTP_200_OK, response_data
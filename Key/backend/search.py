@@ -0,0 +1,120 @@
+import uuid
+
+from django.db import connections, router
+from django.db.models import Q
+from django.db.utils import DatabaseError
+
+SEARCH_TABLE = 'backend_student_search'
+
+# The trigram tokenizer cannot match anything shorter than three characters
+MIN_FUZZY_LENGTH = 3
+
+# Upper bound on fuzzy matches scored per query
+FUZZY_CANDIDATES = 500
+
+# Sorts after any character, turning a prefix into an index range scan
+PREFIX_UPPER_BOUND = '\U0010ffff'
+
+_available = {}
+
+
+def search_rowid(student_id):
+    """Map a student UUID onto a positive 63-bit FTS rowid"""
+    return student_id.int >> 65
+
+
+def _search_table_available(alias):
+    if alias not in _available:
+        connection = connections[alias]
+        _available[alias] = (
+            connection.vendor == 'sqlite'
+            and SEARCH_TABLE in connection.introspection.table_names()
+        )
+    return _available[alias]
+
+
+def index_student(student):
+    """Refresh the full-text row for a student"""
+    alias = router.db_for_write(type(student), instance=student)
+    if not _search_table_available(alias):
+        return
+    rowid = search_rowid(student.id)
+    with connections[alias].cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [rowid])
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE}(rowid, student_id, name, admission_number) "
+            "VALUES (%s, %s, %s, %s)",
+            [rowid, student.id.hex, student.name, student.admission_number],
+        )
+
+
+def unindex_student(student):
+    """Remove a deleted student from the full-text index"""
+    alias = router.db_for_write(type(student), instance=student)
+    if not _search_table_available(alias):
+        return
+    with connections[alias].cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [search_rowid(student.id)])
+
+
+def _prefix_matches(queryset, field, query, limit):
+    """Case-sensitive prefix match written as a range so the column index is used"""
+    lookup = {f'{field}__gte': query, f'{field}__lt': query + PREFIX_UPPER_BOUND}
+    return list(queryset.filter(**lookup).order_by(field)[:limit])
+
+
+def _fuzzy_ids(alias, query, limit):
+    """
+    Rank trigram matches on name and admission number with bm25. Only the
+    first FUZZY_CANDIDATES matches are scored so that very common trigrams
+    cannot turn a lookup into a scan of the whole index.
+    """
+    phrase = '"' + query.replace('"', '""') + '"'
+    with connections[alias].cursor() as cursor:
+        cursor.execute(
+            f"SELECT student_id, bm25({SEARCH_TABLE}) FROM {SEARCH_TABLE} "
+            f"WHERE {SEARCH_TABLE} MATCH %s LIMIT %s",
+            ['{name admission_number} : ' + phrase, FUZZY_CANDIDATES],
+        )
+        rows = sorted(cursor.fetchall(), key=lambda row: row[1])
+    return [uuid.UUID(student_id) for student_id, score in rows[:limit]]
+
+
+def search_students(queryset, query, limit=20):
+    """
+    Return up to `limit` students matching `query`, best matches first:
+    exact admission number, then prefix matches on admission number,
+    name and email, then fuzzy matches on name and admission number.
+    """
+    query = query.strip()
+    if not query:
+        return []
+
+    results = {}
+
+    def collect(students):
+        for student in students:
+            if len(results) >= limit:
+                return
+            results.setdefault(student.pk, student)
+
+    collect(queryset.filter(admission_number=query))
+    for field in ('admission_number', 'name', 'email'):
+        collect(_prefix_matches(queryset, field, query, limit))
+
+    if len(results) < limit and len(query) >= MIN_FUZZY_LENGTH:
+        alias = queryset.db
+        if _search_table_available(alias):
+            try:
+                ids = _fuzzy_ids(alias, query, limit + len(results))
+            except DatabaseError:
+                ids = []
+            matched = queryset.in_bulk(ids)
+            collect(matched[pk] for pk in ids if pk in matched)
+        else:
+            collect(queryset.filter(
+                Q(name__icontains=query) | Q(admission_number__icontains=query)
+            )[:limit])
+
+    return list(results.values())
+
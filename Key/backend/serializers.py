@@ -2,7 +2,7 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework_simplejwt.tokens import RefreshToken
-from .models import Student, EntryLog, LostCardScan
+from .models import Student, EntryLog, LostCardScan, Gate
 
 User = get_user_model()
 
@@ -14,12 +14,27 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'is_student', 'is_admin', 'is_security')
 
 
-class StudentSerializer(serializers.ModelSerializer):
+class DynamicFieldsModelSerializer(serializers.ModelSerializer):
+    """
+    ModelSerializer that takes an optional `fields` argument restricting
+    which of its declared fields are rendered.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        
+        if fields:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+
+class StudentSerializer(DynamicFieldsModelSerializer):
     qr_code_url = serializers.SerializerMethodField()
     
     class Meta:
         model = Student
-        fields = ['id', 'name', 'email', 'admission_number','status', 'qr_code_url', 'created_at']
+        fields = ['id', 'name', 'email', 'admission_number','status', 'valid_until', 'qr_code_url', 'created_at']
         read_only_fields = ['id', 'qr_code_url', 'created_at']
     
     def get_qr_code_url(self, obj):
@@ -127,19 +142,28 @@ class RegisterSerializer(serializers.ModelSerializer):
         return user
 
 
+class GateSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Gate
+        fields = ['id', 'name', 'device', 'created_at']
+        read_only_fields = ['id', 'created_at']
+
+
 class EntryLogSerializer(serializers.ModelSerializer):
     student_name = serializers.ReadOnlyField(source='student.name')
+    location = serializers.ReadOnlyField(source='gate.name')
     
     class Meta:
         model = EntryLog
-        fields = ['id', 'student', 'student_name', 'timestamp', 'location', 'successful']
+        fields = ['id', 'student', 'student_name', 'timestamp', 'gate', 'location', 'successful']
         read_only_fields = ['id', 'timestamp']
 
 
 class LostCardScanSerializer(serializers.ModelSerializer):
     student_name = serializers.ReadOnlyField(source='student.name')
+    location = serializers.ReadOnlyField(source='gate.name')
     
     class Meta:
         model = LostCardScan
-        fields = ['id', 'student', 'student_name', 'timestamp', 'location']
+        fields = ['id', 'student', 'student_name', 'timestamp', 'gate', 'location']
 
@@ -0,0 +1,73 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from .events import broker
+
+
+def _authenticate(request):
+    """
+    Resolve the user from the Authorization header, or from ?token= since
+    browser EventSource clients cannot set headers.
+    """
+    authentication = JWTAuthentication()
+    try:
+        header = authentication.get_header(request)
+        raw_token = authentication.get_raw_token(header) if header else None
+        if raw_token is None:
+            raw_token = request.GET.get('token')
+        if not raw_token:
+            return None
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        # Malformed header, bad token, or a deleted or inactive user
+        return None
+
+
+def _format(event):
+    data = json.dumps({'time': event['time'], **event['data']}, cls=DjangoJSONEncoder)
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {data}\n\n"
+
+
+async def event_stream(request):
+    """
+    Server-Sent Events stream of gate activity for security consoles:
+    entry.granted, scan.denied and lostcard.scanned. Optionally filter
+    with ?types=lostcard.scanned,scan.denied.
+
+    Each connection holds an open response, so serve this from the ASGI
+    application (Key/asgi.py) rather than a WSGI worker.
+    """
+    user = await sync_to_async(_authenticate)(request)
+    if user is None:
+        return JsonResponse({'error': 'Authentication credentials were not provided.'}, status=401)
+    if not (user.is_admin or user.is_security or user.is_staff):
+        return JsonResponse({'error': 'Permission denied'}, status=403)
+
+    types = [t for t in request.GET.get('types', '').split(',') if t] or None
+    keepalive = getattr(settings, 'EVENT_STREAM_KEEPALIVE_SECONDS', 15)
+    subscription = broker.subscribe(types)
+
+    async def stream():
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                events = await subscription.next_batch(timeout=keepalive)
+                if not events:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ': keepalive\n\n'
+                    continue
+                yield ''.join(_format(event) for event in events)
+        finally:
+            broker.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,3 +1,219 @@
-from django.test import TestCase
+import json
+import shutil
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import caches
+from django.http import JsonResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from django.views import View
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import throttling
+from .fast_serializers import FastEntryLogSerializer, FastLostCardScanSerializer, FastStudentSerializer
+from .models import EntryLog, Gate, LostCardScan, Student, User
+from .routers import ReadReplicaRouter, ReplicaReadMixin, replica_alias, replica_reads
+from .serializers import EntryLogSerializer, LostCardScanSerializer, StudentSerializer
+
+
+class RoutingProbeView(ReplicaReadMixin, View):
+    """Reports where the router sends reads before and after a write"""
+    router = ReadReplicaRouter()
+
+    def get(self, request):
+        before = self.router.db_for_read(Student)
+        self.router.db_for_write(Student)
+        after = self.router.db_for_read(Student)
+        return JsonResponse({'before_write': before, 'after_write': after})
+
+    post = get
+
+
+@mock.patch('backend.routers.replica_alias', return_value='replica')
+class ReadReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReadReplicaRouter()
+        self.factory = RequestFactory()
+
+    def probe(self, method):
+        response = RoutingProbeView.as_view()(getattr(self.factory, method)('/'))
+        return json.loads(response.content)
+
+    def test_get_reads_from_replica(self, _):
+        self.assertEqual(self.probe('get')['before_write'], 'replica')
+
+    def test_write_pins_rest_of_request_to_primary(self, _):
+        # A lagging replica may not have the row yet, so reads after a
+        # write in the same request must not go there
+        self.assertIsNone(self.probe('get')['after_write'])
+
+    def test_unsafe_methods_use_primary(self, _):
+        self.assertEqual(self.probe('post'), {'before_write': None, 'after_write': None})
+
+    def test_pin_does_not_outlive_request(self, _):
+        self.probe('get')
+        self.assertIsNone(self.router.db_for_read(Student))
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(Student), 'replica')
+
+    def test_writes_always_go_to_primary(self, _):
+        with replica_reads():
+            self.assertEqual(self.router.db_for_write(Student), 'default')
+
+
+class TempMediaMixin:
+    """Keeps card images generated on save out of the real MEDIA_ROOT"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.media_root = tempfile.mkdtemp()
+        cls.media_override = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media_override.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.media_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+
+
+class ReplicaFallbackTests(TempMediaMixin, TestCase):
+    @override_settings(REPLICA_DATABASE='missing')
+    def test_alias_not_in_databases(self):
+        # As when KEY_REPLICA_DB is unset and 'replica' is never added
+        self.assertIsNone(replica_alias())
+        with replica_reads():
+            self.assertIsNone(ReadReplicaRouter().db_for_read(Student))
+
+    @override_settings(REPLICA_DATABASE=None)
+    def test_no_replica_setting(self):
+        self.assertIsNone(replica_alias())
+        with replica_reads():
+            self.assertIsNone(ReadReplicaRouter().db_for_read(Student))
+
+    @override_settings(REPLICA_DATABASE=None)
+    def test_list_view_served_from_primary(self):
+        admin = User.objects.create_user('admin', password='pw', is_staff=True, is_admin=True)
+        Student.objects.create(name='Ann', admission_number='A1', email='ann@example.com')
+        client = APIClient()
+        client.force_authenticate(admin)
+        response = client.get('/api/students/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'A1')
+
+
+class FastSerializerEquivalenceTests(TestCase):
+    """The values-based fast serializers must render the same JSON as the ModelSerializers"""
+
+    @classmethod
+    def setUpTestData(cls):
+        # bulk_create skips save(), so no card images are rendered
+        students = Student.objects.bulk_create([
+            Student(
+                name=f'Student {i}',
+                email=f'student{i}@example.com',
+                admission_number=f'ADM{i:04d}',
+                status=['active', 'lost', 'expired'][i % 3],
+                valid_until=date(2027, 1, 1) + timedelta(days=i) if i % 2 else None,
+                qr_code=f'qr_codes/ab/cd/card{i}.png' if i % 3 else None,
+            )
+            for i in range(12)
+        ])
+        gates = [Gate.objects.create(name=name) for name in ('Main Gate', 'Library')]
+        now = timezone.now()
+        EntryLog.objects.bulk_create([
+            EntryLog(
+                student=students[i % len(students)],
+                gate=gates[i % 2],
+                timestamp=now - timedelta(minutes=i, microseconds=i),
+                successful=bool(i % 4),
+            )
+            for i in range(20)
+        ])
+        LostCardScan.objects.bulk_create([
+            LostCardScan(student=students[i], gate=gates[i % 2], timestamp=now - timedelta(hours=i))
+            for i in range(5)
+        ])
+
+    def setUp(self):
+        self.context = {'request': Request(RequestFactory().get('/'))}
+
+    def assertSameJSON(self, queryset, model_serializer, fast_serializer, fields=None):
+        kwargs = {'fields': fields} if fields else {}
+        expected = model_serializer(queryset, many=True, context=self.context, **kwargs).data
+        fast = fast_serializer(context=self.context, fields=fields)
+        actual = fast.serialize(fast.values(queryset))
+        self.assertEqual(JSONRenderer().render(actual), JSONRenderer().render(expected))
+
+    def test_students(self):
+        queryset = Student.objects.order_by('admission_number')
+        self.assertTrue(queryset.filter(valid_until__isnull=False).exists())
+        self.assertTrue(queryset.filter(qr_code__isnull=False).exists())
+        self.assertSameJSON(queryset, StudentSerializer, FastStudentSerializer)
+
+    def test_student_fields_subset(self):
+        self.assertSameJSON(
+            Student.objects.order_by('admission_number'),
+            StudentSerializer,
+            FastStudentSerializer,
+            fields=['id', 'admission_number', 'valid_until', 'qr_code_url'],
+        )
+
+    def test_entry_logs(self):
+        self.assertSameJSON(
+            EntryLog.objects.select_related('student', 'gate').order_by('-timestamp'),
+            EntryLogSerializer,
+            FastEntryLogSerializer,
+        )
+
+    def test_lost_card_scans(self):
+        self.assertSameJSON(
+            LostCardScan.objects.select_related('student', 'gate').order_by('-timestamp'),
+            LostCardScanSerializer,
+            FastLostCardScanSerializer,
+        )
+
+
+class LoginThrottleTests(SimpleTestCase):
+    def setUp(self):
+        caches['default'].clear()
+        throttling._blocked.clear()
+
+    @override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {'auth_login': '2/min'}})
+    def test_forwarded_for_does_not_reset_bucket(self):
+        throttle = throttling.LoginRateThrottle()
+        factory = RequestFactory()
+        allowed = [
+            throttle.allow_request(Request(factory.post('/auth/login/', HTTP_X_FORWARDED_FOR=f'10.0.0.{i}')), None)
+            for i in range(4)
+        ]
+        self.assertEqual(allowed, [True, True, False, False])
+
+
+class ScanThrottleTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        throttling._blocked.clear()
+        self.device = User.objects.create_user('gate-1', password='pw', is_security=True)
+
+    def bearer(self):
+        return {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(self.device).access_token}'}
+
+    @override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {'verify_qr': '2/min'}})
+    def test_keyed_by_token_user_before_authentication(self):
+        client = APIClient()
+        # A new access token for the same device shares the bucket, and the
+        # over-limit request is refused without loading the user
+        codes = [client.post('/api/verify-qr/', {'qr_data': 'x'}, format='json', **self.bearer()).status_code
+                 for _ in range(2)]
+        with self.assertNumQueries(0):
+            response = client.post('/api/verify-qr/', {'qr_data': 'x'}, format='json', **self.bearer())
+        self.assertEqual(codes, [400, 400])
+        self.assertEqual(response.status_code, 429)
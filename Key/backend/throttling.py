@@ -0,0 +1,149 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .cache import BoundedTTLCache
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Clients this process has recently seen run out of tokens, mapped to the
+# monotonic time they may try again. Repeat offenders are turned away here
+# without a round trip to the shared cache.
+_blocked = BoundedTTLCache(maxsize=getattr(settings, 'THROTTLE_BLOCKLIST_SIZE', 10000), ttl=3600)
+
+
+def parse_rate(rate):
+    """'120/min' -> (capacity, tokens refilled per second)"""
+    if rate is None:
+        return None
+    count, period = rate.split('/')
+    capacity = int(count)
+    return capacity, capacity / PERIODS[period[0].lower()]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token bucket per client and scope. A bucket holds up to `capacity`
+    tokens and refills continuously; each request takes one. Rates come
+    from REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'][scope], in DRF's
+    'count/period' form; a missing or None rate disables the throttle.
+
+    Clients are identified by the user id in a valid access token (a gate
+    device's account), read from the token itself without loading the
+    user, or by IP address when there is none. Nothing here touches the
+    ORM, so EarlyThrottleMixin can run these before authentication. Buckets
+    live in the cache named by THROTTLE_CACHE; with a shared backend such
+    as Redis the limit holds across workers, though concurrent updates may
+    occasionally let an extra request through.
+    """
+    scope = None
+    cache_alias = getattr(settings, 'THROTTLE_CACHE', 'default')
+
+    def get_rate(self):
+        return parse_rate(api_settings.DEFAULT_THROTTLE_RATES.get(self.scope))
+
+    def get_token_user_id(self, request):
+        """User id claim of a valid Bearer access token, or None"""
+        parts = request.META.get('HTTP_AUTHORIZATION', '').split()
+        if len(parts) != 2 or parts[0] not in jwt_settings.AUTH_HEADER_TYPES:
+            return None
+        try:
+            # Signature and expiry only; refreshing gives a new token for
+            # the same user, and so the same bucket
+            return AccessToken(parts[1]).get(jwt_settings.USER_ID_CLAIM)
+        except TokenError:
+            return None
+
+    def get_client_key(self, request):
+        user_id = self.get_token_user_id(request)
+        if user_id is not None:
+            ident = f'user:{user_id}'
+        else:
+            ident = 'ip:' + self.get_ident(request)
+        return f'throttle:{self.scope}:{ident}'
+
+    def allow_request(self, request, view):
+        rate = self.get_rate()
+        if rate is None:
+            return True
+        capacity, refill = rate
+        key = self.get_client_key(request)
+
+        now = time.monotonic()
+        retry_at = _blocked.get(key)
+        if retry_at is not None and retry_at > now:
+            self.wait_seconds = retry_at - now
+            return False
+
+        cache = caches[self.cache_alias]
+        wall_now = time.time()
+        tokens, updated = cache.get(key) or (capacity, wall_now)
+        tokens = min(capacity, tokens + (wall_now - updated) * refill)
+
+        if tokens < 1:
+            self.wait_seconds = (1 - tokens) / refill
+            _blocked.set(key, now + self.wait_seconds, ttl=self.wait_seconds)
+            return False
+
+        # Keep the bucket only as long as it takes to refill completely
+        cache.set(key, (tokens - 1, wall_now), timeout=int(capacity / refill) + 1)
+        return True
+
+    def wait(self):
+        return getattr(self, 'wait_seconds', None)
+
+
+class ScanRateThrottle(TokenBucketThrottle):
+    scope = 'verify_qr'
+
+
+class BatchScanRateThrottle(TokenBucketThrottle):
+    scope = 'verify_qr_batch'
+
+
+class ImageScanRateThrottle(TokenBucketThrottle):
+    scope = 'verify_qr_image'
+
+
+class AnonRateThrottle(TokenBucketThrottle):
+    """
+    Keyed by client IP alone. Anything the caller controls, such as the
+    Authorization header or the token being refreshed, would let them
+    start a fresh bucket with every request.
+    """
+
+    def get_client_key(self, request):
+        return f'throttle:{self.scope}:ip:{self.get_ident(request)}'
+
+
+class LoginRateThrottle(AnonRateThrottle):
+    scope = 'auth_login'
+
+
+class RefreshRateThrottle(AnonRateThrottle):
+    scope = 'auth_refresh'
+
+
+class EarlyThrottleMixin:
+    """
+    APIView mixin that checks throttles before authentication and
+    permissions, so over-limit requests are rejected before the user is
+    loaded. Only use with throttles that do not read request.user, such
+    as the TokenBucketThrottle family.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        self.check_throttles(request)
+        self._throttles_checked = True
+        super().initial(request, *args, **kwargs)
+
+    def check_throttles(self, request):
+        if getattr(self, '_throttles_checked', False):
+            return
+        super().check_throttles(request)
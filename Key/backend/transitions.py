@@ -0,0 +1,117 @@
+import uuid
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .debounce import scan_debouncer
+from .models import Student
+from .notifications import queue_mail
+
+# action -> resulting card status
+TRANSITIONS = {
+    'expire': 'expired',
+    'deactivate': 'deactivated',
+    'recover': 'active',
+}
+
+NOTIFICATIONS = {
+    'expire': (
+        'ID Card Expired',
+        'Your ID card has been marked as expired. Please contact the administration to renew your ID card.',
+    ),
+    'deactivate': (
+        'ID Card Deactivated',
+        'Your ID card has been deactivated. Please contact the administration for more information.',
+    ),
+    'recover': (
+        'ID Card Reactivated',
+        'Your ID card is active again and can be used at all entry points.',
+    ),
+}
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def filter_students(filters, queryset=None):
+    """
+    Narrow students down by a filter dict with any of: ids, status,
+    admission_number_prefix, created_before, created_after. An empty filter
+    is rejected unless it sets all=True. Raises ValueError on bad input.
+    """
+    if queryset is None:
+        queryset = Student.objects.all()
+    filters = dict(filters or {})
+    select_all = filters.pop('all', False)
+
+    if not filters and not select_all:
+        raise ValueError('Provide at least one filter, or all=true to select every student')
+
+    unknown = set(filters) - {'ids', 'status', 'admission_number_prefix', 'created_before', 'created_after'}
+    if unknown:
+        raise ValueError(f"Unknown filters: {', '.join(sorted(unknown))}")
+
+    if 'ids' in filters:
+        ids = filters['ids']
+        if not isinstance(ids, list):
+            raise ValueError('ids must be a list of student ids')
+        try:
+            ids = [uuid.UUID(str(pk)) for pk in ids]
+        except ValueError:
+            raise ValueError('ids must be a list of student ids')
+        queryset = queryset.filter(pk__in=ids)
+    if 'status' in filters:
+        statuses = [value for value, label in Student._meta.get_field('status').choices]
+        if filters['status'] not in statuses:
+            raise ValueError(f"status must be one of: {', '.join(statuses)}")
+        queryset = queryset.filter(status=filters['status'])
+    if 'admission_number_prefix' in filters:
+        queryset = queryset.filter(admission_number__startswith=filters['admission_number_prefix'])
+    for key, lookup in (('created_before', 'created_at__lt'), ('created_after', 'created_at__gte')):
+        if key in filters:
+            value = parse_datetime(str(filters[key]))
+            if value is None:
+                raise ValueError(f'{key} must be an ISO 8601 datetime')
+            if timezone.is_naive(value):
+                value = timezone.make_aware(value)
+            queryset = queryset.filter(**{lookup: value})
+    return queryset
+
+
+def bulk_transition(queryset, action, chunk_size=DEFAULT_CHUNK_SIZE, notify=True, wait_for_mail=False):
+    """
+    Apply `action` to every student in `queryset` with chunked UPDATE
+    statements instead of one save() per student. Students already in the
+    target status are skipped. Returns the number of students changed.
+
+    Notifications go out on a background thread; management commands pass
+    wait_for_mail=True so the process does not exit before they are sent.
+    """
+    new_status = TRANSITIONS[action]
+    pending = queryset.exclude(status=new_status).order_by('pk')
+    updated = 0
+    recipients = []
+    last_pk = None
+
+    while True:
+        chunk = pending if last_pk is None else pending.filter(pk__gt=last_pk)
+        rows = list(chunk.values_list('pk', 'email')[:chunk_size])
+        if not rows:
+            break
+        ids = [pk for pk, email in rows]
+        last_pk = ids[-1]
+
+        # update() bypasses auto_now, so bump updated_at for list ETags
+        with transaction.atomic():
+            updated += Student.objects.filter(pk__in=ids).exclude(status=new_status).update(
+                status=new_status, updated_at=timezone.now()
+            )
+        scan_debouncer.forget_many(ids)
+        recipients.extend(email for pk, email in rows if email)
+
+    if notify and recipients:
+        subject, message = NOTIFICATIONS[action]
+        thread = queue_mail([(subject, message, [email]) for email in recipients])
+        if wait_for_mail and thread is not None:
+            thread.join()
+    return updated
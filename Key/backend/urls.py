@@ -2,21 +2,29 @@
 from django.urls import path
 from .views import (
     StudentListView,
+    StudentSearchView,
     StudentDetailView,
     ReportLostCardView,
     VerifyQRCodeView,
+    BatchVerifyQRCodeView,
+    VerifyQRImageView,
     EntryLogListView,
+    GateListView,
     LostCardScansListView,
     RequestNewCardView,
     AdminDashboardStatsView,
     BulkImportStudentsView,
     ExpireStudentIDView,
+    BulkStudentStatusView,
+    MetricsView,
 )
+from .streams import event_stream
 
 urlpatterns = [
     
     # Student URLs
     path('students/', StudentListView.as_view(), name='student_list'),
+    path('students/search/', StudentSearchView.as_view(), name='student_search'),
     path('students/<uuid:id>/', StudentDetailView.as_view(), name='student_detail'),
     path('students/profile/', StudentDetailView.as_view(), name='student_own_profile'),
     path('students/<uuid:pk>/report-lost/', ReportLostCardView.as_view(), name='report_lost_card'),
@@ -25,12 +33,18 @@ urlpatterns = [
     path('students/request-new-card/', RequestNewCardView.as_view(), name='request_own_new_card'),
     path('students/<uuid:pk>/expire/', ExpireStudentIDView.as_view(), name='expire_student_id'),
     path('students/bulk-import/', BulkImportStudentsView.as_view(), name='bulk_import_students'),
+    path('students/bulk-status/', BulkStudentStatusView.as_view(), name='bulk_student_status'),
     
     # Entry and Scanning URLs
     path('verify-qr/', VerifyQRCodeView.as_view(), name='verify_qr_code'),
+    path('verify-qr/batch/', BatchVerifyQRCodeView.as_view(), name='verify_qr_code_batch'),
+    path('verify-qr/image/', VerifyQRImageView.as_view(), name='verify_qr_code_image'),
     path('entry-logs/', EntryLogListView.as_view(), name='entry_log_list'),
     path('lost-card-scans/', LostCardScansListView.as_view(), name='lost_card_scans_list'),
+    path('gates/', GateListView.as_view(), name='gate_list'),
+    path('events/', event_stream, name='event_stream'),
     
     # Admin Dashboard
     path('admin/dashboard/stats/', AdminDashboardStatsView.as_view(), name='admin_dashboard_stats'),
+    path('admin/metrics/', MetricsView.as_view(), name='admin_metrics'),
 ]
\ No newline at end of file
@@ -1,29 +1,68 @@
-from rest_framework import generics, status, views
+from rest_framework import generics, serializers, status, views
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.parsers import MultiPartParser
 from django.shortcuts import get_object_or_404
+from django.http import FileResponse, HttpResponse
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.http import quote_etag
 from django.conf import settings
 from django.core.mail import send_mail
 from django.contrib.auth import get_user_model
 from django.db import transaction
-from rest_framework_simplejwt.views import TokenObtainPairView
+from django.utils.crypto import get_random_string
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework_simplejwt.tokens import RefreshToken
-from .models import Student, EntryLog, LostCardScan
+from .models import Student, EntryLog, LostCardScan, Gate
+from .gates import gate_resolver, normalize_gate_name
+from .idempotency import idempotent
+from .throttling import (
+    EarlyThrottleMixin,
+    BatchScanRateThrottle,
+    ImageScanRateThrottle,
+    LoginRateThrottle,
+    RefreshRateThrottle,
+    ScanRateThrottle,
+)
+from .scanning import DECISIONS, verify_scan
+from .decoding import DecodeTimeout, DecoderBusy, DecoderUnavailable, ImageTooLarge, decoder_pool
+from .search import search_students
+from .routers import ReplicaReadMixin
+from .transitions import TRANSITIONS, bulk_transition, filter_students
+from .metrics import registry
+from .pagination import OptionalPageNumberPagination
+from .fast_serializers import (
+    FastListMixin,
+    FastEntryLogSerializer,
+    FastLostCardScanSerializer,
+    FastStudentSerializer,
+)
 from .serializers import (
     StudentSerializer, 
     EntryLogSerializer, 
     LostCardScanSerializer,
+    GateSerializer,
     UserSerializer,
     CustomTokenObtainPairSerializer,
     RegisterSerializer
 )
-import uuid
+import hashlib
+import re
 
 User = get_user_model()
 
 
-class CustomTokenObtainPairView(TokenObtainPairView):
+class CustomTokenObtainPairView(EarlyThrottleMixin, TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
+    throttle_classes = [LoginRateThrottle]
+
+
+class ThrottledTokenRefreshView(EarlyThrottleMixin, TokenRefreshView):
+    throttle_classes = [RefreshRateThrottle]
 
 
 class StudentRegistrationView(generics.CreateAPIView):
@@ -77,10 +116,92 @@ class LogoutView(views.APIView):
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
-class StudentListView(generics.ListAPIView):
+class StudentListView(ReplicaReadMixin, FastListMixin, generics.ListAPIView):
+    """
+    Student list with opt-in pagination (?page= / ?page_size=), sparse
+    fieldsets (?fields=id,name) and conditional GET. Unchanged polls are
+    answered with 304 without serializing the table.
+    """
     queryset = Student.objects.all()
     serializer_class = StudentSerializer
+    fast_serializer_class = FastStudentSerializer
     permission_classes = [IsAuthenticated, IsAdminUser]
+    pagination_class = OptionalPageNumberPagination
+    
+    def get_requested_fields(self):
+        fields = self.request.query_params.get('fields')
+        if not fields:
+            return None
+        return [name.strip() for name in fields.split(',') if name.strip()]
+    
+    def get_queryset(self):
+        return Student.objects.order_by('pk')
+    
+    def get_serializer(self, *args, **kwargs):
+        kwargs['fields'] = self.get_requested_fields()
+        return super().get_serializer(*args, **kwargs)
+    
+    def get_fast_serializer(self):
+        # Only the columns behind the requested fields are fetched
+        return self.fast_serializer_class(
+            context=self.get_serializer_context(),
+            fields=self.get_requested_fields(),
+        )
+    
+    def get_etag(self):
+        """
+        ETag for the current table state and query. There is deliberately no
+        Last-Modified: max(updated_at) in whole seconds misses deletes and
+        same-second changes, which would turn If-Modified-Since into stale 304s.
+        """
+        state = Student.objects.aggregate(last_modified=Max('updated_at'), total=Count('pk'))
+        last_modified = state['last_modified']
+        fingerprint = '|'.join([
+            last_modified.isoformat() if last_modified else '',
+            str(state['total']),
+            self.request.get_host(),
+            self.request.META.get('QUERY_STRING', ''),
+        ])
+        return quote_etag(hashlib.md5(fingerprint.encode()).hexdigest())
+    
+    def list(self, request, *args, **kwargs):
+        etag = self.get_etag()
+        
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+        
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class StudentSearchView(ReplicaReadMixin, generics.ListAPIView):
+    """
+    Ranked prefix and fuzzy search over student name, admission number and email
+    """
+    serializer_class = StudentSerializer
+    permission_classes = [IsAuthenticated]
+    default_limit = 20
+    max_limit = 50
+    
+    def get_queryset(self):
+        return Student.objects.all()
+    
+    def list(self, request, *args, **kwargs):
+        # Only admins and security staff may look up students
+        if not (request.user.is_admin or request.user.is_security or request.user.is_staff):
+            return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
+        
+        query = request.query_params.get('q', '')
+        try:
+            limit = min(int(request.query_params.get('limit', self.default_limit)), self.max_limit)
+        except ValueError:
+            limit = self.default_limit
+        
+        students = search_students(self.get_queryset(), query, limit=max(limit, 1))
+        serializer = self.get_serializer(students, many=True)
+        return Response(serializer.data)
 
 
 class StudentDetailView(generics.RetrieveUpdateAPIView):
@@ -109,6 +230,7 @@ class StudentDetailView(generics.RetrieveUpdateAPIView):
 class ReportLostCardView(views.APIView):
     permission_classes = [IsAuthenticated]
     
+    @idempotent
     def post(self, request, pk=None):
         # If no ID provided, use the student's own ID
         if pk is None and hasattr(request.user, 'student_profile'):
@@ -142,17 +264,18 @@ class ReportLostCardView(views.APIView):
         })
 
 
-class VerifyQRCodeView(views.APIView):
+class VerifyQRCodeView(EarlyThrottleMixin, views.APIView):
     """
     API endpoint for scanning QR codes at entry points
     """
     permission_classes = [IsAuthenticated]  # Usually restricted to security personnel or scanning devices
+    throttle_classes = [ScanRateThrottle]  # Per device account, checked before authentication
     
+    @idempotent
     def post(self, request):
         try:
             # Get the QR code data from the request
             qr_data = request.data.get('qr_data')
-            location = request.data.get('location', 'Unknown')
             
             if not qr_data:
                 return Response({
@@ -160,126 +283,232 @@ class VerifyQRCodeView(views.APIView):
                     'message': 'QR code data is required'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            # Convert the QR data to UUID and find the student
-            student_uuid = uuid.UUID(qr_data)
-            student = Student.objects.get(id=student_uuid)
-            
-            # Check if the card is reported as lost
-            if student.status == 'lost':
-                # Record the lost card scan
-                LostCardScan.objects.create(
-                    student=student,
-                    location=location
-                )
-                
-                # Send email notification
-                try:
-                    send_mail(
-                        subject=f'Alert: Lost ID Card Used',
-                        message=f'Your ID card that was reported as lost has been scanned at {location}. Please contact security immediately.',
-                        from_email=settings.DEFAULT_FROM_EMAIL,
-                        recipient_list=[student.email],
-                        fail_silently=False,
-                    )
-                except Exception as e:
-                    # Continue even if email fails
-                    pass
-                
-                return Response({
-                    'status': 'error',
-                    'message': 'This ID card has been reported as lost',
-                    'student': {
-                        'id': str(student.id),
-                        'name': student.name,
-                        'admission_number': student.admission_number
-                    }
-                }, status=status.HTTP_403_FORBIDDEN)
+            # Scanner accounts bound to a gate report it; others name it in the payload
+            gate = gate_resolver.for_request(request)
             
-            # Check if the card is expired
-            if student.status == 'expired':
-                return Response({
-                    'status': 'error',
-                    'message': 'This ID card has expired',
-                    'student': {
-                        'id': str(student.id),
-                        'name': student.name,
-                        'admission_number': student.admission_number
-                    }
-                }, status=status.HTTP_403_FORBIDDEN)
-            
-            # If card is active, log the entry
-            entry_log = EntryLog.objects.create(
-                student=student,
-                location=location,
-                successful=True
-            )
+            status_code, data = verify_scan(qr_data, gate)
+            return Response(data, status=status_code)
             
+        except Exception as e:
             return Response({
-                'status': 'success',
-                'message': 'Access granted',
-                'student': {
-                    'id': str(student.id),
-                    'name': student.name,
-                    'admission_number': student.admission_number
-                },
-                'entry': {
-                    'id': entry_log.id,
-                    'timestamp': entry_log.timestamp,
-                    'location': entry_log.location
-                }
-            })
-            
-        except ValueError:
+                'status': 'error',
+                'message': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class BatchVerifyQRCodeView(EarlyThrottleMixin, views.APIView):
+    """
+    Verifies a batch of scans queued by an offline-capable gate client.
+    Each scan is {"qr_data", "scanned_at", "client_id", "decision"}, where
+    the optional decision is the "allow" or "deny" the gate already acted
+    on; the results list the same per-scan answer verify-qr/ would have
+    given, in order, while the entry log records the gate's decision.
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [BatchScanRateThrottle]
+    
+    @idempotent
+    def post(self, request):
+        scans = request.data.get('scans')
+        if not isinstance(scans, list) or not scans:
             return Response({
                 'status': 'error',
-                'message': 'Invalid QR code format'
+                'message': 'A list of scans is required'
             }, status=status.HTTP_400_BAD_REQUEST)
-            
-        except Student.DoesNotExist:
+        
+        max_scans = getattr(settings, 'VERIFY_BATCH_MAX_SCANS', 200)
+        if len(scans) > max_scans:
             return Response({
                 'status': 'error',
-                'message': 'Student not found'
-            }, status=status.HTTP_404_NOT_FOUND)
-            
-        except Exception as e:
+                'message': f'At most {max_scans} scans per batch'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        gate = gate_resolver.for_request(request)
+        now = timezone.now()
+        results = []
+        
+        # One commit for the whole batch instead of one per scan
+        with transaction.atomic():
+            for scan in scans:
+                if not isinstance(scan, dict) or not scan.get('qr_data'):
+                    results.append({
+                        'client_id': scan.get('client_id') if isinstance(scan, dict) else None,
+                        'code': status.HTTP_400_BAD_REQUEST,
+                        'status': 'error',
+                        'message': 'QR code data is required'
+                    })
+                    continue
+                
+                decision = scan.get('decision')
+                if decision is not None and decision not in DECISIONS:
+                    results.append({
+                        'client_id': scan.get('client_id'),
+                        'code': status.HTTP_400_BAD_REQUEST,
+                        'status': 'error',
+                        'message': f"decision must be one of {', '.join(DECISIONS)}"
+                    })
+                    continue
+                
+                # Offline scans keep their own time, but never one in the future
+                scanned_at = parse_datetime(str(scan.get('scanned_at') or '')) or now
+                if timezone.is_naive(scanned_at):
+                    scanned_at = timezone.make_aware(scanned_at)
+                scanned_at = min(scanned_at, now)
+                
+                status_code, data = verify_scan(scan['qr_data'], gate, scanned_at, decision)
+                results.append({'client_id': scan.get('client_id'), 'code': status_code, **data})
+        
+        return Response({'status': 'success', 'results': results})
+
+
+class VerifyQRImageView(EarlyThrottleMixin, views.APIView):
+    """
+    Decodes QR codes in photos uploaded by camera-only gate devices (one or
+    more `image` files) and verifies each code as verify-qr/ would. Large
+    uploads are streamed to temporary files by Django's upload handlers.
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [ImageScanRateThrottle]
+    parser_classes = [MultiPartParser]
+    
+    def post(self, request):
+        images = request.FILES.getlist('image')
+        if not images:
             return Response({
                 'status': 'error',
-                'message': str(e)
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+                'message': 'At least one image is required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        max_images = getattr(settings, 'QR_DECODE_MAX_IMAGES', 10)
+        max_bytes = getattr(settings, 'QR_DECODE_MAX_IMAGE_BYTES', 5 * 1024 * 1024)
+        if len(images) > max_images:
+            return Response({
+                'status': 'error',
+                'message': f'At most {max_images} images per request'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Queue every image for decoding before waiting on any of them
+        results = []
+        pending = []
+        for image in images:
+            result = {'image': image.name}
+            results.append(result)
+            if image.size > max_bytes:
+                result.update(code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, status='error',
+                              message=f'Image larger than {max_bytes} bytes')
+                continue
+            try:
+                pending.append((result, decoder_pool.submit(image.read())))
+            except ImageTooLarge:
+                result.update(code=status.HTTP_400_BAD_REQUEST, status='error',
+                              message=f'Image larger than {decoder_pool.max_pixels} pixels')
+            except DecoderBusy:
+                result.update(code=status.HTTP_503_SERVICE_UNAVAILABLE, status='error',
+                              message='Decoder busy, retry shortly')
+        
+        gate = gate_resolver.for_request(request)
+        for result, future in pending:
+            try:
+                codes = decoder_pool.result(future)
+            except DecoderUnavailable:
+                return Response({
+                    'status': 'error',
+                    'message': 'QR decoding is not available on this server'
+                }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            except DecodeTimeout:
+                result.update(code=status.HTTP_504_GATEWAY_TIMEOUT, status='error',
+                              message='Decoding timed out')
+                continue
+            except Exception:
+                result.update(code=status.HTTP_422_UNPROCESSABLE_ENTITY, status='error',
+                              message='Could not read image')
+                continue
+            
+            if not codes:
+                result.update(code=status.HTTP_422_UNPROCESSABLE_ENTITY, status='error',
+                              message='No QR code found in the image')
+                continue
+            
+            # A photo normally shows one card; verify the first code in it
+            status_code, data = verify_scan(codes[0], gate)
+            result.update(code=status_code, qr_data=codes[0], **data)
+        
+        return Response({'status': 'success', 'results': results})
+
+
+def filter_by_gate(request, queryset):
+    """Narrow a log queryset to ?gate=<id>, served by the (gate, timestamp) index"""
+    gate_id = request.query_params.get('gate')
+    if gate_id is None:
+        return queryset
+    try:
+        return queryset.filter(gate_id=int(gate_id))
+    except ValueError:
+        return queryset.none()
+
+
+class GateListView(generics.ListCreateAPIView):
+    """Gates and the scanner accounts bound to them; admins manage, security reads"""
+    queryset = Gate.objects.order_by('name')
+    serializer_class = GateSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def list(self, request, *args, **kwargs):
+        if not (request.user.is_admin or request.user.is_security or request.user.is_staff):
+            return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
+        return super().list(request, *args, **kwargs)
+    
+    def create(self, request, *args, **kwargs):
+        if not (request.user.is_admin or request.user.is_staff):
+            return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
+        return super().create(request, *args, **kwargs)
+    
+    def perform_create(self, serializer):
+        serializer.save(name=normalize_gate_name(serializer.validated_data['name']))
 
 
-class EntryLogListView(generics.ListAPIView):
+class EntryLogListView(ReplicaReadMixin, FastListMixin, generics.ListAPIView):
     serializer_class = EntryLogSerializer
+    fast_serializer_class = FastEntryLogSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = OptionalPageNumberPagination
     
     def get_queryset(self):
         # Students can only see their own logs
         if self.request.user.is_student and hasattr(self.request.user, 'student_profile'):
-            return EntryLog.objects.filter(student=self.request.user.student_profile).order_by('-timestamp')
+            queryset = EntryLog.objects.filter(student=self.request.user.student_profile)
         
         # Admins and security can see all logs
-        if self.request.user.is_admin or self.request.user.is_security:
-            return EntryLog.objects.all().order_by('-timestamp')
+        elif self.request.user.is_admin or self.request.user.is_security:
+            queryset = EntryLog.objects.all()
         
         # Return empty queryset for unauthorized users
-        return EntryLog.objects.none()
+        else:
+            return EntryLog.objects.none()
+        
+        return filter_by_gate(self.request, queryset).select_related('student', 'gate').order_by('-timestamp')
 
 
-class LostCardScansListView(generics.ListAPIView):
+class LostCardScansListView(FastListMixin, generics.ListAPIView):
     serializer_class = LostCardScanSerializer
+    fast_serializer_class = FastLostCardScanSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = OptionalPageNumberPagination
     
     def get_queryset(self):
         # Students can only see their own lost card scans
         if self.request.user.is_student and hasattr(self.request.user, 'student_profile'):
-            return LostCardScan.objects.filter(student=self.request.user.student_profile).order_by('-timestamp')
+            queryset = LostCardScan.objects.filter(student=self.request.user.student_profile)
         
         # Admins and security can see all lost card scans
-        if self.request.user.is_admin or self.request.user.is_security:
-            return LostCardScan.objects.all().order_by('-timestamp')
+        elif self.request.user.is_admin or self.request.user.is_security:
+            queryset = LostCardScan.objects.all()
         
         # Return empty queryset for unauthorized users
-        return LostCardScan.objects.none()
+        else:
+            return LostCardScan.objects.none()
+        
+        return filter_by_gate(self.request, queryset).select_related('student', 'gate').order_by('-timestamp')
 
 
 class UserDetailView(generics.RetrieveUpdateAPIView):
@@ -290,9 +519,71 @@ class UserDetailView(generics.RetrieveUpdateAPIView):
         return self.request.user
 
 
+class IgnoreClientContentNegotiation(BaseContentNegotiation):
+    """Serve the view's own content type whatever the client's Accept header says"""
+    
+    def select_parser(self, request, parsers):
+        return parsers[0]
+    
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return (renderers[0], renderers[0].media_type)
+
+
+class QRCodeMediaView(views.APIView):
+    """
+    Serves QR card images to their owner, admins and security staff. The
+    transfer itself is handed to the front proxy with X-Accel-Redirect
+    (nginx) or X-Sendfile (Apache, lighttpd) when MEDIA_SENDFILE_BACKEND
+    is set, so workers never stream image bytes.
+    """
+    permission_classes = [IsAuthenticated]
+    content_negotiation_class = IgnoreClientContentNegotiation
+    
+    # Content-addressed names from qr_upload_to never change content
+    versioned_name = re.compile(r'^qr_codes/[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})\.png$')
+    
+    def get(self, request, path):
+        name = f'qr_codes/{path}'
+        student = get_object_or_404(Student, qr_code=name)
+        
+        # Only the owner, admins and security staff may fetch a card
+        is_owner = hasattr(request.user, 'student_profile') and request.user.student_profile.id == student.id
+        if not (is_owner or request.user.is_admin or request.user.is_security):
+            return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
+        
+        versioned = self.versioned_name.match(name)
+        etag = quote_etag(versioned.group(1)) if versioned else None
+        if etag:
+            not_modified = get_conditional_response(request, etag=etag)
+            if not_modified is not None:
+                return self.with_cache_headers(not_modified, etag)
+        
+        storage = student.qr_code.storage
+        backend = getattr(settings, 'MEDIA_SENDFILE_BACKEND', None)
+        if backend == 'nginx':
+            response = HttpResponse(content_type='image/png')
+            response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + name
+        elif backend == 'xsendfile':
+            response = HttpResponse(content_type='image/png')
+            response['X-Sendfile'] = storage.path(name)
+        else:
+            response = FileResponse(storage.open(name, 'rb'), content_type='image/png')
+        return self.with_cache_headers(response, etag)
+    
+    def with_cache_headers(self, response, etag):
+        if etag:
+            response['ETag'] = etag
+            patch_cache_control(response, private=True, max_age=31536000, immutable=True)
+        else:
+            # Legacy names can be overwritten, so always revalidate
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
 class RequestNewCardView(views.APIView):
     permission_classes = [IsAuthenticated]
     
+    @idempotent
     def post(self, request, pk=None):
         # If no ID provided, use the student's own ID
         if pk is None and hasattr(request.user, 'student_profile'):
@@ -305,15 +596,12 @@ class RequestNewCardView(views.APIView):
                                               request.user.student_profile.id != student.id):
                 return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
         
-        # Reset the student's QR code
-        student.qr_code = None
-        
         # If the card was lost, make it active again
         if student.status == 'lost':
             student.status = 'active'
         
-        # Save to generate a new QR code
-        student.save()
+        # Save with a new QR code, replacing the old image file
+        student.regenerate_qr_code()
         
         # Send email notification
         try:
@@ -338,7 +626,7 @@ class RequestNewCardView(views.APIView):
         })
 
 
-class AdminDashboardStatsView(views.APIView):
+class AdminDashboardStatsView(ReplicaReadMixin, views.APIView):
     permission_classes = [IsAuthenticated, IsAdminUser]
     
     def get(self, request):
@@ -349,12 +637,14 @@ class AdminDashboardStatsView(views.APIView):
         expired_cards = Student.objects.filter(status='expired').count()
         
         # Recent entry logs
-        recent_entries = EntryLog.objects.all().order_by('-timestamp')[:10]
-        recent_entries_data = EntryLogSerializer(recent_entries, many=True).data
+        entry_serializer = FastEntryLogSerializer()
+        recent_entries = entry_serializer.values(EntryLog.objects.all().order_by('-timestamp'))[:10]
+        recent_entries_data = entry_serializer.serialize(recent_entries)
         
         # Recent lost card scans
-        recent_lost_scans = LostCardScan.objects.all().order_by('-timestamp')[:10]
-        recent_lost_scans_data = LostCardScanSerializer(recent_lost_scans, many=True).data
+        scan_serializer = FastLostCardScanSerializer()
+        recent_lost_scans = scan_serializer.values(LostCardScan.objects.all().order_by('-timestamp'))[:10]
+        recent_lost_scans_data = scan_serializer.serialize(recent_lost_scans)
         
         return Response({
             'total_students': total_students,
@@ -369,6 +659,7 @@ class AdminDashboardStatsView(views.APIView):
 class BulkImportStudentsView(views.APIView):
     permission_classes = [IsAuthenticated, IsAdminUser]
     
+    @idempotent
     @transaction.atomic
     def post(self, request):
         students_data = request.data.get('students', [])
@@ -396,7 +687,7 @@ class BulkImportStudentsView(views.APIView):
                 user = User.objects.create_user(
                     username=admission_number,
                     email=student_data.get('email'),
-                    password=User.objects.make_random_password()  # Generate random password
+                    password=get_random_string(16)  # Generate random password
                 )
                 user.is_student = True
                 user.save()
@@ -406,6 +697,7 @@ class BulkImportStudentsView(views.APIView):
                     name=student_data.get('name'),
                     email=student_data.get('email'),
                     admission_number=admission_number,
+                    valid_until=student_data.get('valid_until'),
                     user=user
                 )
                 
@@ -450,3 +742,54 @@ class ExpireStudentIDView(views.APIView):
             'status': 'success',
             'message': f'Card for {student.name} has been expired'
         })
+
+
+class BulkStudentStatusView(views.APIView):
+    """
+    Apply expire, deactivate or recover to a filtered set of students in
+    chunked updates, e.g. {"action": "expire", "filter": {"admission_number_prefix": "E3-"}}
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    
+    def post(self, request):
+        action = request.data.get('action')
+        if action not in TRANSITIONS:
+            return Response({
+                'status': 'error',
+                'message': f"action must be one of: {', '.join(TRANSITIONS)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            students = filter_students(request.data.get('filter'))
+        except (ValueError, TypeError) as e:
+            return Response({
+                'status': 'error',
+                'message': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            # Accepts true/false, "true"/"false", 1/0 as DRF boolean fields do
+            notify = serializers.BooleanField().to_internal_value(request.data.get('notify', True))
+        except serializers.ValidationError:
+            return Response({
+                'status': 'error',
+                'message': 'notify must be true or false'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        updated_count = bulk_transition(students, action, notify=notify)
+        
+        return Response({
+            'status': 'success',
+            'message': f'Updated {updated_count} students',
+            'updated_count': updated_count
+        })
+
+
+class MetricsView(views.APIView):
+    """
+    Per-view request, database and render timings in Prometheus text format
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    
+    def get(self, request):
+        return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,334 @@
+"""
+Offline-first client for a scanning gate.
+
+Frames from the camera are decoded with pyzbar (as in qrreader). Cards the
+gate has seen recently are answered instantly from a local verdict cache and
+their scans are queued in a local SQLite file along with the gate's decision;
+a background thread pushes the queue to /api/verify-qr/batch/ in batches,
+backing off while the backend is slow or unreachable. The backend logs the
+decision the gate made rather than deciding again. Unknown cards are verified directly with a short timeout
+and fall back to the offline policy when the backend does not answer in time.
+
+Example:
+    client = GateClient('https://key.example.edu', token='<access JWT>', refresh_token='<refresh JWT>')
+    client.start()
+    verdicts = client.process_frame(frame)
+    ...
+    client.stop()
+"""
+import hashlib
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+ALLOW = 'allow'
+DENY = 'deny'
+
+
+class ScanQueue:
+    """Durable FIFO of scans waiting to be pushed, stored in SQLite"""
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS scans ('
+            ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+            ' client_id TEXT NOT NULL UNIQUE,'
+            ' qr_data TEXT NOT NULL,'
+            ' scanned_at TEXT NOT NULL,'
+            ' decision TEXT)'
+        )
+        columns = [row[1] for row in self._db.execute('PRAGMA table_info(scans)')]
+        if 'decision' not in columns:
+            # Queue files written before decisions were recorded
+            self._db.execute('ALTER TABLE scans ADD COLUMN decision TEXT')
+
+    def put(self, qr_data, scanned_at, decision):
+        client_id = uuid.uuid4().hex
+        with self._lock:
+            self._db.execute(
+                'INSERT INTO scans (client_id, qr_data, scanned_at, decision) VALUES (?, ?, ?, ?)',
+                (client_id, qr_data, scanned_at, decision),
+            )
+        return client_id
+
+    def peek(self, limit):
+        """Oldest `limit` scans as (id, client_id, qr_data, scanned_at, decision) rows"""
+        with self._lock:
+            return self._db.execute(
+                'SELECT id, client_id, qr_data, scanned_at, decision FROM scans ORDER BY id LIMIT ?',
+                (limit,)
+            ).fetchall()
+
+    def ack(self, ids):
+        with self._lock:
+            self._db.executemany('DELETE FROM scans WHERE id = ?', [(i,) for i in ids])
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute('SELECT count(*) FROM scans').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class VerdictCache:
+    """Bounded LRU of recent verdicts per card, each expiring after `ttl` seconds"""
+
+    def __init__(self, maxsize=5000, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, qr_data):
+        with self._lock:
+            item = self._data.get(qr_data)
+            if item is None:
+                return None
+            expires_at, verdict = item
+            if expires_at <= time.monotonic():
+                del self._data[qr_data]
+                return None
+            self._data.move_to_end(qr_data)
+            return verdict
+
+    def set(self, qr_data, verdict):
+        with self._lock:
+            self._data[qr_data] = (time.monotonic() + self.ttl, verdict)
+            self._data.move_to_end(qr_data)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+class GateClient:
+    def __init__(self, base_url, token, location=None, queue_path='gate_queue.sqlite3',
+                 batch_size=50, flush_interval=1.0, max_backoff=60.0, verdict_ttl=300,
+                 verify_timeout=1.5, push_timeout=10.0, repeat_window=3.0, offline_policy=DENY,
+                 refresh_token=None):
+        self.base_url = base_url.rstrip('/')
+        self.token = token
+        self.refresh_token = refresh_token
+        self._token_lock = threading.Lock()
+        self.location = location
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+        self.verify_timeout = verify_timeout
+        self.push_timeout = push_timeout
+        self.repeat_window = repeat_window
+        self.offline_policy = offline_policy
+
+        self.queue = ScanQueue(queue_path)
+        self.verdicts = VerdictCache(ttl=verdict_ttl)
+        self._last_seen = {}
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    # Decoding
+
+    def decode_frame(self, frame):
+        """Return the QR payloads in a camera frame or PIL image"""
+        from pyzbar.pyzbar import decode
+
+        return [obj.data.decode('utf-8') for obj in decode(frame)]
+
+    def process_frame(self, frame):
+        """Decode a frame and return a verdict for each new card in it"""
+        verdicts = []
+        now = time.monotonic()
+        for qr_data in self.decode_frame(frame):
+            # A card held under the camera shows up in many frames in a row
+            if now - self._last_seen.get(qr_data, float('-inf')) < self.repeat_window:
+                continue
+            self._last_seen[qr_data] = now
+            verdicts.append(self.scan(qr_data))
+        if len(self._last_seen) > 1000:
+            self._last_seen = {k: t for k, t in self._last_seen.items() if now - t < self.repeat_window}
+        return verdicts
+
+    # Scanning
+
+    def scan(self, qr_data):
+        """
+        Return {'allowed': bool, 'source': ..., 'message': ...} for a card.
+        Known cards are answered from the verdict cache and queued for the
+        batch push; unknown cards are verified with the backend directly.
+        """
+        scanned_at = datetime.now(timezone.utc).isoformat()
+        cached = self.verdicts.get(qr_data)
+        if cached is not None:
+            self.queue.put(qr_data, scanned_at, cached['verdict'])
+            self._wake.set()
+            return {'allowed': cached['verdict'] == ALLOW, 'source': 'cache', 'message': cached['message']}
+
+        try:
+            code, data = self._post('/api/verify-qr/', self._verify_body(qr_data), self.verify_timeout,
+                                    idempotency_key=uuid.uuid4().hex)
+        except (urllib.error.URLError, TimeoutError, OSError):
+            code, data = None, None
+
+        if code is None or code >= 500 or code in (401, 429):
+            # Backend unavailable: decide locally and log the scan later
+            self.queue.put(qr_data, scanned_at, self.offline_policy)
+            return {
+                'allowed': self.offline_policy == ALLOW,
+                'source': 'offline',
+                'message': 'Backend unavailable',
+            }
+
+        self._remember(qr_data, code, data)
+        return {'allowed': code == 200, 'source': 'backend', 'message': data.get('message', '')}
+
+    def _verify_body(self, qr_data):
+        body = {'qr_data': qr_data}
+        if self.location:
+            body['location'] = self.location
+        return body
+
+    def _remember(self, qr_data, code, data):
+        # Only definite answers are cached; malformed or unknown codes are not
+        if code == 200:
+            self.verdicts.set(qr_data, {'verdict': ALLOW, 'message': data.get('message', '')})
+        elif code == 403:
+            self.verdicts.set(qr_data, {'verdict': DENY, 'message': data.get('message', '')})
+
+    # Pushing
+
+    def start(self):
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name='gate-push', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.queue.close()
+
+    def _run(self):
+        backoff = 0.0
+        while not self._stopping.is_set():
+            self._wake.wait(backoff or self.flush_interval)
+            self._wake.clear()
+            try:
+                while not self._stopping.is_set() and self.push_once():
+                    pass
+                backoff = 0.0
+            except Exception as e:
+                # Anything unexpected (a truncated or non-JSON response, a
+                # reset mid-read, a locked queue file) must not end the thread
+                after = e.after if isinstance(e, _RetryLater) else None
+                backoff = min(self.max_backoff, max(backoff * 2, 1.0, after or 0))
+                # Jitter keeps a fleet of gates from retrying in lockstep
+                backoff *= random.uniform(0.8, 1.2)
+                logger.warning('Scan push failed (%s); retrying in %.1fs', e, backoff,
+                               exc_info=not isinstance(e, _RetryLater))
+
+    def push_once(self):
+        """Push one batch; returns False once the queue is empty"""
+        rows = self.queue.peek(self.batch_size)
+        if not rows:
+            return False
+
+        body = {
+            'scans': [
+                {'client_id': client_id, 'qr_data': qr_data, 'scanned_at': scanned_at, 'decision': decision}
+                for _, client_id, qr_data, scanned_at, decision in rows
+            ],
+        }
+        if self.location:
+            body['location'] = self.location
+        # Same batch, same key: a retry after a lost response is replayed, not re-applied
+        key = hashlib.sha256(''.join(row[1] for row in rows).encode()).hexdigest()
+
+        try:
+            code, data = self._post('/api/verify-qr/batch/', body, self.push_timeout, idempotency_key=key)
+        except (urllib.error.URLError, TimeoutError, OSError) as e:
+            raise _RetryLater(str(e))
+
+        # 409: the backend is still applying this batch from an earlier attempt
+        if code == 429 or code >= 500 or code in (401, 403, 409):
+            raise _RetryLater(f'HTTP {code}', after=data.get('retry_after'))
+        if code >= 400:
+            # The backend will never accept this batch; drop it rather than block the queue
+            logger.error('Dropping %d queued scans rejected with HTTP %d: %s', len(rows), code, data)
+        else:
+            by_client_id = {row[1]: row[2] for row in rows}
+            for result in data.get('results', []):
+                qr_data = by_client_id.get(result.get('client_id'))
+                if qr_data is not None:
+                    self._remember(qr_data, result.get('code'), result)
+        self.queue.ack([row[0] for row in rows])
+        return True
+
+    def _post(self, path, body, timeout, idempotency_key=None):
+        token = self.token
+        code, data = self._send(path, body, timeout, idempotency_key)
+        # Access tokens are short-lived; get a new one and try once more
+        if code == 401 and self._refresh_access_token(token, timeout):
+            code, data = self._send(path, body, timeout, idempotency_key)
+        return code, data
+
+    def _refresh_access_token(self, expired_token, timeout):
+        """Swap the refresh token for a new access token; False if that failed"""
+        if not self.refresh_token:
+            return False
+        with self._token_lock:
+            if self.token != expired_token:
+                # Another thread refreshed it while this one waited
+                return True
+            code, data = self._send('/auth/refresh/', {'refresh': self.refresh_token}, timeout,
+                                    authorize=False)
+            if code != 200 or 'access' not in data:
+                logger.error('Token refresh failed with HTTP %d: %s', code, data)
+                return False
+            self.token = data['access']
+            # Present when the backend rotates refresh tokens
+            self.refresh_token = data.get('refresh', self.refresh_token)
+            return True
+
+    def _send(self, path, body, timeout, idempotency_key=None, authorize=True):
+        request = urllib.request.Request(
+            self.base_url + path,
+            data=json.dumps(body).encode('utf-8'),
+            method='POST',
+            headers={'Content-Type': 'application/json'},
+        )
+        if authorize:
+            request.add_header('Authorization', f'Bearer {self.token}')
+        if idempotency_key:
+            request.add_header('Idempotency-Key', idempotency_key)
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return response.status, json.loads(response.read() or b'{}')
+        except urllib.error.HTTPError as e:
+            try:
+                data = json.loads(e.read() or b'{}')
+            except ValueError:
+                data = {}
+            retry_after = e.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                data['retry_after'] = int(retry_after)
+            return e.code, data
+
+
+class _RetryLater(Exception):
+    def __init__(self, message, after=None):
+        super().__init__(message)
+        self.after = after
@@ -1,8 +1,15 @@
+import io
+
 from pyzbar.pyzbar import decode
 from PIL import Image
-import cv2
 import numpy as np
 
+# Larger photos are scaled down before decoding; QR codes stay readable and
+# decode time stays bounded
+MAX_DECODE_SIDE = 2000
+# Images with more pixels than this are refused before being decoded
+MAX_DECODE_PIXELS = 24_000_000
+
 def decode_qr_code_from_image(image_path):
     """
     Decode QR code from an image file.
@@ -28,6 +35,34 @@ def decode_qr_code_from_image(image_path):
     else:
         return "No QR code found in the image"
 
+def decode_qr_codes_from_bytes(data, max_side=MAX_DECODE_SIDE, max_pixels=MAX_DECODE_PIXELS):
+    """
+    Decode every QR code in an encoded image (PNG, JPEG, ...).
+    
+    Parameters:
+    data (bytes): The image file contents
+    max_side (int): Longest side, in pixels, the image is scaled down to
+    max_pixels (int): Largest image, in pixels, that is decoded at all
+    
+    Returns:
+    list: Decoded data of each QR code found, possibly empty
+    
+    Raises:
+    ValueError: If the image is larger than max_pixels
+    """
+    image = Image.open(io.BytesIO(data))
+    # Only the header has been read so far; draft() below helps JPEG alone
+    if image.width * image.height > max_pixels:
+        raise ValueError(f'Image larger than {max_pixels} pixels')
+    # Let JPEG decode straight to a reduced greyscale image where it can
+    image.draft('L', (max_side, max_side))
+    image = image.convert('L')
+    if max(image.size) > max_side:
+        image.thumbnail((max_side, max_side))
+    
+    decoded_objects = decode(np.asarray(image))
+    return [obj.data.decode('utf-8') for obj in decoded_objects]
+
 def decode_qr_code_from_camera():
     """
     Decode QR code from camera feed in real-time.
@@ -36,6 +71,9 @@ def decode_qr_code_from_camera():
     Returns:
     str: Decoded data from the QR code
     """
+    # OpenCV is only needed for the live camera scanner
+    import cv2
+    
     # Initialize camera
     cap = cv2.VideoCapture(0)
     
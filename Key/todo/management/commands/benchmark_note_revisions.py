@@ -0,0 +1,90 @@
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.benchmarks import percentile, throwaway_database
+from todo.models import Note, NoteRevision
+from todo.revisions import SNAPSHOT_INTERVAL, revision_content
+
+WORDS = (
+    'meeting budget review draft plan schedule update client report deadline '
+    'follow up notes idea task list design test release bug fix sprint'
+).split()
+
+
+def random_line(rnd):
+    return ' '.join(rnd.choices(WORDS, k=rnd.randint(4, 14))) + '\n'
+
+
+class Command(BaseCommand):
+    help = (
+        'Edit a long note repeatedly on a throwaway database and report the '
+        'stored bytes per revision against full copies, and the time to '
+        'rebuild revisions from their nearest snapshot.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lines', type=int, default=400, help='Lines in the starting note')
+        parser.add_argument('--revisions', type=int, default=200)
+        parser.add_argument('--edits', type=int, default=3, help='Lines changed per revision')
+        parser.add_argument('--samples', type=int, default=200, help='Revisions rebuilt for timing')
+        parser.add_argument('--seed', type=int, default=2127)
+        parser.add_argument('--output', default='note_revision_benchmark.json')
+
+    def handle(self, *args, **options):
+        rnd = random.Random(options['seed'])
+        with throwaway_database():
+            lines = [random_line(rnd) for _ in range(options['lines'])]
+            note = Note.objects.create(title='Benchmark note', content=''.join(lines))
+            versions = [note.content]
+
+            started = time.perf_counter()
+            for _ in range(options['revisions'] - 1):
+                for _ in range(options['edits']):
+                    action = rnd.random()
+                    index = rnd.randrange(len(lines))
+                    if action < 0.6:
+                        lines[index] = random_line(rnd)
+                    elif action < 0.8:
+                        lines.insert(index, random_line(rnd))
+                    elif len(lines) > 1:
+                        del lines[index]
+                note.content = ''.join(lines)
+                note.save()
+                versions.append(note.content)
+            record_s = time.perf_counter() - started
+
+            revisions = list(NoteRevision.objects.filter(note=note).values_list('data', 'is_snapshot'))
+            stored = sum(len(data) for data, _ in revisions)
+            full_copies = sum(len(text.encode('utf-8')) for text in versions)
+
+            timings = []
+            for number in rnd.choices(range(1, len(versions) + 1), k=options['samples']):
+                started = time.perf_counter()
+                content = revision_content(note.id, number)
+                timings.append(time.perf_counter() - started)
+                if content != versions[number - 1]:
+                    raise CommandError(f'Revision {number} does not rebuild to the saved text')
+
+        timings.sort()
+        results = {
+            'revisions': len(revisions),
+            'snapshots': sum(1 for _, is_snapshot in revisions if is_snapshot),
+            'snapshot_interval': SNAPSHOT_INTERVAL,
+            'average_note_bytes': round(full_copies / len(versions)),
+            'stored_bytes_per_revision': round(stored / len(revisions), 1),
+            'full_copy_bytes_per_revision': round(full_copies / len(versions), 1),
+            'compression_ratio': round(full_copies / stored, 1),
+            'record_ms_per_revision': round(record_s * 1000 / len(versions), 3),
+            'rebuild_p50_ms': round(percentile(timings, 0.50) * 1000, 3),
+            'rebuild_p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+            'rebuild_max_ms': round(timings[-1] * 1000, 3),
+        }
+        for key, value in results.items():
+            self.stdout.write(f'{key:30} {value}')
+
+        with open(options['output'], 'w') as f:
+            json.dump(results, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
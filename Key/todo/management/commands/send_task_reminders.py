@@ -0,0 +1,53 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from todo.reminders import ReminderScheduler
+
+
+class Command(BaseCommand):
+    help = (
+        'Email a reminder for each open task shortly before its deadline. Runs as '
+        'a long-lived worker by default; --once sends what is due now and exits.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lead-minutes', type=int,
+                            default=getattr(settings, 'TODO_REMINDER_LEAD_MINUTES', 60),
+                            help='Remind this many minutes before the deadline')
+        parser.add_argument('--horizon-hours', type=int, default=24,
+                            help='Keep deadlines this far ahead in memory')
+        parser.add_argument('--interval', type=float, default=30,
+                            help='Longest pause between refreshes, in seconds')
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--once', action='store_true', help='Send due reminders and exit')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the reminders that are due')
+
+    def handle(self, *args, **options):
+        scheduler = ReminderScheduler(
+            lead=timedelta(minutes=options['lead_minutes']),
+            horizon=timedelta(hours=options['horizon_hours']),
+            batch_size=options['batch_size'],
+        )
+        scheduler.load()
+        self.stdout.write(f'{len(scheduler)} tasks scheduled')
+
+        while True:
+            due = scheduler.pop_due()
+            if due:
+                sent = scheduler.dispatch(due, dry_run=options['dry_run'])
+                verb = 'Due' if options['dry_run'] else 'Sent'
+                self.stdout.write(self.style.SUCCESS(f'{verb}: {sent} reminders'))
+            if options['once']:
+                return
+
+            # Sleep until the next reminder or the next refresh, whichever is first
+            pause = options['interval']
+            next_due = scheduler.next_due()
+            if next_due is not None:
+                pause = min(pause, max((next_due - timezone.now()).total_seconds(), 0))
+            time.sleep(pause)
+            scheduler.refresh()
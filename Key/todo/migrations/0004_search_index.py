@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:20
+
+from django.db import migrations
+from django.db.utils import OperationalError
+
+
+# Full-text indexes over task and note text, keyed by the model primary key
+# and refreshed from save(), delete() and the batch endpoint.
+CREATE_SEARCH_INDEXES = [
+    """
+    CREATE VIRTUAL TABLE todo_task_search USING fts5(
+        title, description, content, tokenize='porter unicode61', prefix='2 3'
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE todo_note_search USING fts5(
+        title, content, tokenize='porter unicode61', prefix='2 3'
+    )
+    """,
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    # FTS5 is SQLite only; other databases fall back to substring search
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        for statement in CREATE_SEARCH_INDEXES:
+            schema_editor.execute(statement)
+    except OperationalError:
+        # SQLite built without FTS5
+        return
+
+    Task = apps.get_model('todo', 'Task')
+    Note = apps.get_model('todo', 'Note')
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            "INSERT INTO todo_task_search(rowid, title, description, content) VALUES (%s, %s, %s, %s)",
+            [
+                (pk, title, description, '' if content == description else content)
+                for pk, title, description, content
+                in Task.objects.values_list('pk', 'title', 'description', 'content').iterator()
+            ],
+        )
+        cursor.executemany(
+            "INSERT INTO todo_note_search(rowid, title, content) VALUES (%s, %s, %s)",
+            list(Note.objects.values_list('pk', 'title', 'content').iterator()),
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS todo_task_search")
+    schema_editor.execute("DROP TABLE IF EXISTS todo_note_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo', '0003_sync_cursors'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:10
+
+import zlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def snapshot_existing_notes(apps, schema_editor):
+    """Start every existing note's history with a snapshot of its current text"""
+    Note = apps.get_model('todo', 'Note')
+    NoteRevision = apps.get_model('todo', 'NoteRevision')
+    revisions = []
+    for note_id, title, content in Note.objects.values_list('id', 'title', 'content').iterator():
+        content = content or ''
+        revisions.append(NoteRevision(
+            note_id=note_id,
+            number=1,
+            title=title,
+            is_snapshot=True,
+            data=zlib.compress(content.encode('utf-8')),
+            length=len(content),
+            checksum=zlib.crc32(content.encode('utf-8')),
+        ))
+    NoteRevision.objects.bulk_create(revisions, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo', '0005_task_reminders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoteRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField()),
+                ('title', models.CharField(max_length=100)),
+                ('is_snapshot', models.BooleanField(default=False)),
+                ('data', models.BinaryField()),
+                ('length', models.PositiveIntegerField()),
+                ('checksum', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('note', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='todo.note')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('note', 'number'), name='unique_note_revision_number')],
+            },
+        ),
+        migrations.RunPython(snapshot_existing_notes, migrations.RunPython.noop),
+    ]
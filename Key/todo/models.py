@@ -1,4 +1,10 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
+from .revisions import record_revision
+from .search import index_objects, unindex_objects
 from django.contrib.auth import get_user_model
 User = get_user_model()
 
@@ -12,7 +18,28 @@ class Task(models.Model):
     status = models.CharField(max_length=50, default="In Progress")
     title = models.CharField(max_length=100)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    reminder_sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Due-task scans by the reminder scheduler walk this in deadline order
+            models.Index(fields=["completed", "deadline"], name="task_completed_deadline_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        index_objects("task", [self])
+
+    def delete(self, *args, **kwargs):
+        unindex_objects("task", Task, [self.pk])
+        return super().delete(*args, **kwargs)
+
+    @classmethod
+    def on_purge(cls, pks):
+        """Called by the retention purge before the rows are bulk deleted"""
+        unindex_objects("task", cls, pks)
+        Tombstone.objects.bulk_create([Tombstone(kind="task", object_id=pk) for pk in pks])
 
     def __str__(self):
         return f"Task: {self.title[:30]}"
@@ -22,7 +49,79 @@ class Note(models.Model):
     title = models.CharField(max_length=100)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        note = super().from_db(db, field_names, values)
+        # The stored content is the base the next revision is diffed against
+        note._loaded_content = note.__dict__.get("content")
+        return note
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        index_objects("note", [self])
+        record_revision(self, getattr(self, "_loaded_content", None))
+        self._loaded_content = self.content
+
+    def delete(self, *args, **kwargs):
+        unindex_objects("note", Note, [self.pk])
+        return super().delete(*args, **kwargs)
+
+    @classmethod
+    def on_purge(cls, pks):
+        """Called by the retention purge before the rows are bulk deleted"""
+        unindex_objects("note", cls, pks)
+        Tombstone.objects.bulk_create([Tombstone(kind="note", object_id=pk) for pk in pks])
 
     def __str__(self):
         return f"Note: {self.content[:30]}"
+
+
+class NoteRevision(models.Model):
+    """
+    One saved version of a note. Snapshots hold the zlib-compressed text;
+    other revisions hold a compressed line delta against the revision
+    before them (see todo.revisions).
+    """
+    note = models.ForeignKey(Note, on_delete=models.CASCADE, related_name="revisions")
+    number = models.PositiveIntegerField()
+    title = models.CharField(max_length=100)
+    is_snapshot = models.BooleanField(default=False)
+    data = models.BinaryField()
+    length = models.PositiveIntegerField()
+    checksum = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["note", "number"], name="unique_note_revision_number"),
+        ]
+
+    def __str__(self):
+        return f"Note {self.note_id} revision {self.number}"
+
+
+class Tombstone(models.Model):
+    """Records a deleted task or note so delta syncs can tell clients to drop it"""
+    KIND_CHOICES = [("task", "Task"), ("note", "Note")]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.IntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"Deleted {self.kind} {self.object_id}"
+
+
+def sync_cursor(now=None):
+    """
+    A change cursor set TODO_SYNC_CURSOR_MARGIN_SECONDS behind now.
+    updated_at and deleted_at are stamped before the write commits, so a
+    write still waiting on the database lock or inside a slow batch can
+    become visible with a timestamp older than now. Polling from this
+    cursor reads such rows (and some already-seen ones) again instead of
+    skipping them.
+    """
+    margin = getattr(settings, "TODO_SYNC_CURSOR_MARGIN_SECONDS", 60)
+    return (now or timezone.now()) - timedelta(seconds=margin)
@@ -0,0 +1,138 @@
+import heapq
+import logging
+
+from django.utils import timezone
+
+from backend.notifications import queue_mail
+
+from .models import Task, Tombstone, sync_cursor
+
+logger = logging.getLogger(__name__)
+
+
+class ReminderScheduler:
+    """
+    Keeps the open tasks whose deadlines fall inside a rolling horizon in a
+    min-heap, so finding due reminders never scans the task table.
+
+    The heap is filled from the (completed, deadline) index and then kept
+    current from the updated_at sync cursor: tasks edited since the last
+    refresh (less the sync margin, to catch late commits) are re-read, and
+    tombstoned tasks are dropped. Superseded heap entries are skipped
+    lazily when popped.
+    """
+
+    def __init__(self, lead, horizon, batch_size=100):
+        self.lead = lead
+        self.horizon = horizon
+        self.batch_size = batch_size
+        self._heap = []
+        # Current deadline per scheduled task; heap entries that disagree are stale
+        self._deadlines = {}
+        self._cursor = None
+        self._loaded_until = None
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def _schedule(self, task_id, deadline):
+        self._deadlines[task_id] = deadline
+        heapq.heappush(self._heap, (deadline, task_id))
+
+    def _unschedule(self, task_id):
+        self._deadlines.pop(task_id, None)
+
+    def _pending(self):
+        return Task.objects.filter(completed=False, reminder_sent_at__isnull=True)
+
+    def load(self, now=None):
+        """Fill the heap with open tasks due before the horizon, in index order"""
+        now = now or timezone.now()
+        self._cursor = sync_cursor(now)
+        self._extend(now + self.horizon)
+
+    def _extend(self, until):
+        tasks = self._pending().filter(deadline__lte=until)
+        if self._loaded_until is not None:
+            tasks = tasks.filter(deadline__gt=self._loaded_until)
+        for task_id, deadline in tasks.order_by('deadline').values_list('id', 'deadline').iterator():
+            self._schedule(task_id, deadline)
+        self._loaded_until = until
+
+    def refresh(self, now=None):
+        """Apply task edits and deletes made since the last refresh"""
+        now = now or timezone.now()
+        # Overlapping polls re-read some tasks; unchanged ones are skipped below
+        since, self._cursor = self._cursor, sync_cursor(now)
+
+        changed = Task.objects.filter(updated_at__gte=since).values_list(
+            'id', 'deadline', 'completed', 'reminder_sent_at'
+        )
+        for task_id, deadline, completed, reminder_sent_at in changed.iterator():
+            if completed or reminder_sent_at is not None or deadline > self._loaded_until:
+                self._unschedule(task_id)
+            elif self._deadlines.get(task_id) != deadline:
+                self._schedule(task_id, deadline)
+
+        deleted = Tombstone.objects.filter(kind='task', deleted_at__gte=since)
+        for task_id in deleted.values_list('object_id', flat=True):
+            self._unschedule(task_id)
+
+        # Roll the horizon forward, reading only the newly covered slice
+        self._extend(now + self.horizon)
+
+    def pop_due(self, now=None):
+        """Remove and return the ids of tasks whose reminder time has come"""
+        now = now or timezone.now()
+        due = []
+        while self._heap and self._heap[0][0] - self.lead <= now:
+            deadline, task_id = heapq.heappop(self._heap)
+            if self._deadlines.get(task_id) == deadline:
+                del self._deadlines[task_id]
+                due.append(task_id)
+        return due
+
+    def next_due(self):
+        """Reminder time of the earliest scheduled task, or None"""
+        while self._heap:
+            deadline, task_id = self._heap[0]
+            if self._deadlines.get(task_id) == deadline:
+                return deadline - self.lead
+            heapq.heappop(self._heap)
+        return None
+
+    def dispatch(self, task_ids, dry_run=False):
+        """
+        Email reminders for the given tasks in batches and mark them sent.
+        Tasks completed or already reminded since they were scheduled are
+        skipped, as are owners without an email address, though their tasks
+        are still marked so they are not retried. Returns the number of
+        reminder emails queued.
+        """
+        sent = 0
+        for start in range(0, len(task_ids), self.batch_size):
+            batch = self._pending().filter(id__in=task_ids[start:start + self.batch_size])
+            tasks = list(batch.select_related('user').order_by('deadline'))
+            if not tasks:
+                continue
+
+            messages = [
+                (
+                    f'Reminder: {task.title}',
+                    f'Your task "{task.title}" is due at '
+                    f'{timezone.localtime(task.deadline):%Y-%m-%d %H:%M}.',
+                    [task.user.email],
+                )
+                for task in tasks if task.user.email
+            ]
+            sent += len(messages)
+            if dry_run:
+                continue
+
+            # update() leaves updated_at alone, so the sync cursor does not
+            # resend tasks just because a reminder went out
+            Task.objects.filter(id__in=[task.id for task in tasks]).update(reminder_sent_at=timezone.now())
+            thread = queue_mail(messages)
+            if thread is not None:
+                thread.join()
+        return sent
@@ -0,0 +1,120 @@
+import difflib
+import json
+import zlib
+
+from django.conf import settings
+
+# Every Nth revision of a note is stored whole, so rebuilding any revision
+# applies at most N - 1 deltas
+SNAPSHOT_INTERVAL = getattr(settings, 'NOTE_SNAPSHOT_INTERVAL', 20)
+
+
+def checksum(text):
+    return zlib.crc32(text.encode('utf-8'))
+
+
+def encode_delta(previous, current):
+    """
+    Describe `current` as line ranges copied from `previous` ([start, end])
+    and inserted text (strings), compressed with zlib.
+    """
+    old_lines = previous.splitlines(keepends=True)
+    new_lines = current.splitlines(keepends=True)
+    ops = []
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append(''.join(new_lines[j1:j2]))
+    return zlib.compress(json.dumps(ops, separators=(',', ':')).encode('utf-8'))
+
+
+def apply_delta(previous, data):
+    old_lines = previous.splitlines(keepends=True)
+    parts = []
+    for op in json.loads(zlib.decompress(data)):
+        if isinstance(op, str):
+            parts.append(op)
+        else:
+            parts.extend(old_lines[op[0]:op[1]])
+    return ''.join(parts)
+
+
+def encode_snapshot(text):
+    return zlib.compress(text.encode('utf-8'))
+
+
+def decode_snapshot(data):
+    return zlib.decompress(data).decode('utf-8')
+
+
+def record_revision(note, previous_content=None):
+    """
+    Append a revision for the note's current title and content, unless
+    neither changed. `previous_content` is the content the last revision
+    is expected to hold; a delta is only written when its checksum agrees,
+    otherwise (or on every SNAPSHOT_INTERVAL-th revision) a snapshot is.
+    """
+    from .models import NoteRevision
+
+    content = note.content or ''
+    latest = note.revisions.order_by('-number').only('number', 'title', 'checksum').first()
+    current_checksum = checksum(content)
+    if latest is not None and latest.checksum == current_checksum and latest.title == note.title:
+        return None
+
+    number = latest.number + 1 if latest else 1
+    snapshot = (
+        latest is None
+        or (number - 1) % SNAPSHOT_INTERVAL == 0
+        or previous_content is None
+        or latest.checksum != checksum(previous_content)
+    )
+    if snapshot:
+        data = encode_snapshot(content)
+    else:
+        data = encode_delta(previous_content, content)
+        # A rewrite can encode larger than the text itself
+        full = encode_snapshot(content)
+        if len(full) <= len(data):
+            data, snapshot = full, True
+
+    return NoteRevision.objects.create(
+        note=note,
+        number=number,
+        title=note.title,
+        is_snapshot=snapshot,
+        data=data,
+        length=len(content),
+        checksum=current_checksum,
+    )
+
+
+def revision_content(note, number):
+    """Rebuild the content of revision `number` from the nearest snapshot"""
+    from .models import NoteRevision
+
+    base = (
+        NoteRevision.objects
+        .filter(note=note, number__lte=number, is_snapshot=True)
+        .order_by('-number')
+        .values_list('number', flat=True)
+        .first()
+    )
+    if base is None:
+        raise NoteRevision.DoesNotExist
+    chain = list(
+        NoteRevision.objects
+        .filter(note=note, number__gte=base, number__lte=number)
+        .order_by('number')
+        .values_list('number', 'is_snapshot', 'data')
+    )
+    if chain[-1][0] != number:
+        raise NoteRevision.DoesNotExist
+
+    content = ''
+    for _, is_snapshot, data in chain:
+        data = bytes(data)
+        content = decode_snapshot(data) if is_snapshot else apply_delta(content, data)
+    return content
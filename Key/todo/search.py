@@ -0,0 +1,160 @@
+import html
+import re
+
+from django.db import connections, router
+from django.db.models import Q
+
+# One FTS5 table per model, keyed by the model's integer primary key. The
+# column lists must match the CREATE statements in migration 0004.
+SEARCH_TABLES = {
+    'task': ('todo_task_search', ('title', 'description', 'content')),
+    'note': ('todo_note_search', ('title', 'content')),
+}
+
+# bm25 column weights: title hits rank above body hits
+WEIGHTS = {
+    'task': (10.0, 2.0, 1.0),
+    'note': (10.0, 1.0),
+}
+
+HIGHLIGHT_OPEN = '<mark>'
+HIGHLIGHT_CLOSE = '</mark>'
+# FTS5 wraps matches in these control characters; the text around them is
+# the user's own and is HTML-escaped before they become the tags above
+_SENTINEL_OPEN = '\x02'
+_SENTINEL_CLOSE = '\x03'
+SNIPPET_TOKENS = 16
+
+_available = {}
+
+
+def _search_tables_available(alias):
+    if alias not in _available:
+        connection = connections[alias]
+        _available[alias] = (
+            connection.vendor == 'sqlite'
+            and {table for table, _ in SEARCH_TABLES.values()} <= set(connection.introspection.table_names())
+        )
+    return _available[alias]
+
+
+def _row(kind, obj):
+    if kind == 'task':
+        # Tasks created through the API carry the same text in both fields
+        content = '' if obj.content == obj.description else obj.content
+        return [obj.pk, obj.title, obj.description, content]
+    return [obj.pk, obj.title, obj.content]
+
+
+def index_objects(kind, objs):
+    """Refresh the full-text rows for saved tasks or notes"""
+    objs = list(objs)
+    if not objs:
+        return
+    alias = router.db_for_write(type(objs[0]), instance=objs[0])
+    if not _search_tables_available(alias):
+        return
+    table, columns = SEARCH_TABLES[kind]
+    placeholders = ', '.join(['%s'] * (len(columns) + 1))
+    with connections[alias].cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {table} WHERE rowid = %s", [[obj.pk] for obj in objs])
+        cursor.executemany(
+            f"INSERT INTO {table}(rowid, {', '.join(columns)}) VALUES ({placeholders})",
+            [_row(kind, obj) for obj in objs],
+        )
+
+
+def unindex_objects(kind, model, pks, using=None):
+    """Remove deleted tasks or notes from the full-text index"""
+    pks = list(pks)
+    alias = using or router.db_for_write(model)
+    if not pks or not _search_tables_available(alias):
+        return
+    table, _ = SEARCH_TABLES[kind]
+    with connections[alias].cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {table} WHERE rowid = %s", [[pk] for pk in pks])
+
+
+def build_match_query(query):
+    """
+    Turn free text into an FTS5 query: every word must match, and the last
+    word also matches as a prefix so results update while the user types.
+    """
+    words = re.findall(r'\w+', query)
+    if not words:
+        return None
+    terms = ['"' + word + '"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def _select(kind):
+    table, _ = SEARCH_TABLES[kind]
+    weights = ', '.join(str(weight) for weight in WEIGHTS[kind])
+    marks = f"char({ord(_SENTINEL_OPEN)}), char({ord(_SENTINEL_CLOSE)})"
+    return (
+        f"SELECT '{kind}', rowid, -bm25({table}, {weights}), "
+        f"highlight({table}, 0, {marks}), "
+        f"snippet({table}, -1, {marks}, '…', {SNIPPET_TOKENS}) "
+        f"FROM {table} WHERE {table} MATCH %s"
+    )
+
+
+def _mark_up(text):
+    """Escape stored text for HTML, turning the match sentinels into <mark> tags"""
+    if text is None:
+        return None
+    return html.escape(text).replace(_SENTINEL_OPEN, HIGHLIGHT_OPEN).replace(_SENTINEL_CLOSE, HIGHLIGHT_CLOSE)
+
+
+def search_todos(query, kinds=('task', 'note'), page=1, page_size=20, using='default'):
+    """
+    Rank tasks and notes matching `query` with bm25 and return one page as
+    (total, [(kind, pk, score, title, snippet)]), highest score first.
+    Titles and snippets are HTML-escaped, with matches wrapped in <mark>.
+    """
+    match = build_match_query(query)
+    if match is None:
+        return 0, []
+    offset = (page - 1) * page_size
+
+    if not _search_tables_available(using):
+        return _search_fallback(query, kinds, offset, page_size, using)
+
+    with connections[using].cursor() as cursor:
+        total = 0
+        for kind in kinds:
+            table, _ = SEARCH_TABLES[kind]
+            cursor.execute(f"SELECT count(*) FROM {table} WHERE {table} MATCH %s", [match])
+            total += cursor.fetchone()[0]
+        cursor.execute(
+            ' UNION ALL '.join(_select(kind) for kind in kinds) + ' ORDER BY 3 DESC LIMIT %s OFFSET %s',
+            [match] * len(kinds) + [page_size, offset],
+        )
+        rows = [
+            (kind, pk, score, _mark_up(title), _mark_up(snippet))
+            for kind, pk, score, title, snippet in cursor.fetchall()
+        ]
+    return total, rows
+
+
+def _search_fallback(query, kinds, offset, page_size, using):
+    """Unranked substring search for databases without FTS5"""
+    from .models import Note, Task
+
+    filters = {
+        'task': (Task, Q(title__icontains=query) | Q(description__icontains=query) | Q(content__icontains=query), 'description'),
+        'note': (Note, Q(title__icontains=query) | Q(content__icontains=query), 'content'),
+    }
+    rows = []
+    total = 0
+    for kind in kinds:
+        model, condition, body = filters[kind]
+        queryset = model.objects.using(using).filter(condition).order_by('-updated_at')
+        total += queryset.count()
+        rows += [
+            (kind, pk, None, _mark_up(title), _mark_up(text[:200]))
+            for pk, title, text in queryset.values_list('pk', 'title', body)[:offset + page_size]
+        ]
+    return total, rows[offset:offset + page_size]
+
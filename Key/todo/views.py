@@ -2,14 +2,27 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
-from .models import Task, Note
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from .models import Task, Note, NoteRevision, Tombstone, sync_cursor
+from .revisions import record_revision, revision_content
+from .search import SEARCH_TABLES, index_objects, search_todos, unindex_objects
+from backend.retention import retention_cutoff
 import json
 from datetime import datetime
+from dateutil import parser as date_parser
 
 # Hardcoded credentials
 HARD_CODED_USERNAME = 'Mutai'  
 HARD_CODED_PASSWORD = 'mutai2127'  
 
+User = get_user_model()
+
+TASK_SYNC_FIELDS = ('id', 'title', 'description', 'completed', 'deadline', 'status', 'updated_at')
+NOTE_SYNC_FIELDS = ('id', 'title', 'content', 'created_at', 'updated_at')
+
 @csrf_exempt
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -24,6 +37,8 @@ def login(request):
     # Check against hardcoded credentials
     if username == HARD_CODED_USERNAME and password == HARD_CODED_PASSWORD:
         # If credentials are correct, return a success message along with the tasks
+        # and a cursor the client can pass to sync/ from then on
+        cursor = sync_cursor()
         tasks = list(Task.objects.all().values('id', 'title', 'description', 'completed', 'deadline', 'status'))
         notes = list(
             Note.objects.all().values(
@@ -33,6 +48,7 @@ def login(request):
         return JsonResponse(
             {
                 "success": True,
+                "cursor": cursor,
                 "tasks": tasks if tasks else [],
                 "notes": notes if notes else [],
             }
@@ -40,6 +56,324 @@ def login(request):
     else:
         return JsonResponse({'error': 'Invalid credentials'}, status=401)
 
+def _json_body(request):
+    """The request body as a dict, or None if it is not a JSON object"""
+    try:
+        data = json.loads(request.body)
+    except ValueError:  # JSONDecodeError, or a body that is not UTF-8
+        return None
+    return data if isinstance(data, dict) else None
+
+
+@csrf_exempt
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def sync(request):
+    """
+    Returns tasks and notes changed since the `since` cursor, plus the ids of
+    those deleted, and a new cursor for the next call. Without `since`, or
+    with one older than tombstone retention, the full data set is returned.
+    """
+    data = _json_body(request)
+    if data is None:
+        return JsonResponse({'error': 'Request body must be a JSON object'}, status=400)
+    username = data.get('username')
+    password = data.get('password')
+
+    if username != HARD_CODED_USERNAME or password != HARD_CODED_PASSWORD:
+        return JsonResponse({'error': 'Invalid credentials'}, status=401)
+
+    since = data.get('since')
+    if since:
+        try:
+            since = date_parser.isoparse(since)
+        except (TypeError, ValueError):
+            return JsonResponse({'error': 'Invalid since cursor'}, status=400)
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        # Tombstones older than this have been purged, so a delta from an
+        # older cursor could miss deletions; send everything instead
+        tombstone_cutoff = retention_cutoff('todo.Tombstone')
+        if tombstone_cutoff and since < tombstone_cutoff:
+            since = None
+
+    # Taken before querying; `since` is inclusive, so rows written while this
+    # request runs are sent again next time rather than missed
+    cursor = sync_cursor()
+
+    tasks = Task.objects.all()
+    notes = Note.objects.all()
+    tombstones = Tombstone.objects.none()
+    if since:
+        tasks = tasks.filter(updated_at__gte=since)
+        notes = notes.filter(updated_at__gte=since)
+        tombstones = Tombstone.objects.filter(deleted_at__gte=since)
+
+    deleted = {'tasks': [], 'notes': []}
+    for kind, object_id in tombstones.values_list('kind', 'object_id'):
+        deleted[kind + 's'].append(object_id)
+
+    return JsonResponse({
+        'success': True,
+        'cursor': cursor,
+        'full': not since,
+        'tasks': list(tasks.values(*TASK_SYNC_FIELDS)),
+        'notes': list(notes.values(*NOTE_SYNC_FIELDS)),
+        'deleted': deleted,
+    })
+
+def _task_data(task):
+    return {
+        'id': task.id,
+        'title': task.title,
+        'description': task.description,
+        'completed': task.completed,
+        'deadline': task.deadline,
+        'status': task.status,
+    }
+
+
+def _note_data(note):
+    return {
+        'id': note.id,
+        'title': note.title,
+        'content': note.content,
+        'created_at': note.created_at,
+        'updated_at': note.updated_at,
+    }
+
+
+def _apply_task_fields(task, fields):
+    """Apply the fields manage_task accepts; returns an error message or None"""
+    deadline = fields.get('deadline')
+    if isinstance(deadline, str):
+        try:
+            deadline = date_parser.isoparse(deadline)
+        except ValueError:
+            return 'Invalid deadline format'
+    if fields.get('title'):
+        task.title = fields['title']
+    if fields.get('description'):
+        task.description = fields['description']
+    if fields.get('completed') is not None:
+        task.completed = fields['completed']
+    if deadline and deadline != task.deadline:
+        task.deadline = deadline
+        # A moved deadline gets a fresh reminder
+        task.reminder_sent_at = None
+    if fields.get('status'):
+        task.status = fields['status']
+    return None
+
+
+def _apply_note_fields(note, fields):
+    if fields.get('title'):
+        note.title = fields['title']
+    if fields.get('content') is not None:
+        note.content = fields['content']
+    return None
+
+
+BATCH_TYPES = {
+    'task': (Task, _apply_task_fields, _task_data, ['title', 'description', 'completed', 'deadline', 'status', 'reminder_sent_at', 'updated_at']),
+    'note': (Note, _apply_note_fields, _note_data, ['title', 'content', 'updated_at']),
+}
+
+
+@csrf_exempt
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def batch(request):
+    """
+    Applies a list of task and note operations in one transaction, e.g.
+    {"op": "update", "type": "task", "id": 3, "data": {"completed": true}}.
+    Invalid operations are reported and skipped; the rest are written with
+    one bulk insert, update and delete per type. Results are returned in
+    operation order.
+    """
+    data = _json_body(request)
+    if data is None:
+        return JsonResponse({'error': 'Request body must be a JSON object'}, status=400)
+    username = data.get('username')
+    password = data.get('password')
+
+    if username != HARD_CODED_USERNAME or password != HARD_CODED_PASSWORD:
+        return JsonResponse({'error': 'Invalid credentials'}, status=401)
+
+    operations = data.get('operations')
+    if not isinstance(operations, list):
+        return JsonResponse({'error': 'operations must be a list'}, status=400)
+    max_operations = getattr(settings, 'TODO_BATCH_MAX_OPERATIONS', 500)
+    if len(operations) > max_operations:
+        return JsonResponse({'error': f'At most {max_operations} operations per batch'}, status=400)
+
+    # Fetch every referenced record up front, one query per type
+    existing = {}
+    for kind, (model, _, _, _) in BATCH_TYPES.items():
+        ids = {
+            op.get('id') for op in operations
+            if isinstance(op, dict) and op.get('type') == kind and isinstance(op.get('id'), int)
+        }
+        existing[kind] = model.objects.in_bulk(ids) if ids else {}
+
+    user = None
+    results = [None] * len(operations)
+    created = {kind: [] for kind in BATCH_TYPES}
+    updated = {kind: {} for kind in BATCH_TYPES}
+    deleted = {kind: {} for kind in BATCH_TYPES}
+
+    for index, op in enumerate(operations):
+        if not isinstance(op, dict) or op.get('type') not in BATCH_TYPES:
+            results[index] = {'status': 400, 'error': 'type must be task or note'}
+            continue
+        kind = op['type']
+        model, apply_fields, _, _ = BATCH_TYPES[kind]
+        fields = op.get('data') or {}
+        if not isinstance(fields, dict):
+            results[index] = {'status': 400, 'error': 'data must be an object'}
+            continue
+        action = op.get('op')
+
+        if action == 'create':
+            if kind == 'task':
+                if not fields.get('title') or not fields.get('description') or not fields.get('deadline'):
+                    results[index] = {'status': 400, 'error': 'Title, description, and deadline are required'}
+                    continue
+                if user is None:
+                    user = User.objects.get(username=HARD_CODED_USERNAME)
+                obj = Task(user=user, content=fields['description'])
+            else:
+                if not fields.get('title'):
+                    results[index] = {'status': 400, 'error': 'Title is required'}
+                    continue
+                obj = Note(content='')
+            error = apply_fields(obj, fields)
+            if error:
+                results[index] = {'status': 400, 'error': error}
+                continue
+            created[kind].append((index, obj))
+
+        elif action in ('update', 'delete'):
+            obj = existing[kind].get(op.get('id'))
+            if obj is None or obj.pk in deleted[kind]:
+                results[index] = {'status': 404, 'error': f'{model.__name__} not found'}
+                continue
+            if action == 'delete':
+                # Earlier updates to the record are superseded by the delete
+                for earlier in updated[kind].pop(obj.pk, []):
+                    results[earlier] = {'status': 200, 'id': obj.pk, 'superseded': True}
+                deleted[kind][obj.pk] = index
+                continue
+            error = apply_fields(obj, fields)
+            if error:
+                results[index] = {'status': 400, 'error': error}
+                continue
+            updated[kind].setdefault(obj.pk, []).append(index)
+
+        else:
+            results[index] = {'status': 400, 'error': 'op must be create, update or delete'}
+
+    now = timezone.now()
+    with transaction.atomic():
+        for kind, (model, _, serialize, update_fields) in BATCH_TYPES.items():
+            if created[kind]:
+                model.objects.bulk_create([obj for _, obj in created[kind]])
+                index_objects(kind, [obj for _, obj in created[kind]])
+                if kind == 'note':
+                    for _, obj in created[kind]:
+                        record_revision(obj)
+                for index, obj in created[kind]:
+                    results[index] = {'status': 201, 'data': serialize(obj)}
+
+            if updated[kind]:
+                objs = [existing[kind][pk] for pk in updated[kind]]
+                # bulk_update skips auto_now, so stamp the sync cursor column here
+                for obj in objs:
+                    obj.updated_at = now
+                model.objects.bulk_update(objs, update_fields)
+                index_objects(kind, objs)
+                if kind == 'note':
+                    for obj in objs:
+                        record_revision(obj, getattr(obj, '_loaded_content', None))
+                for pk, indexes in updated[kind].items():
+                    for index in indexes:
+                        results[index] = {'status': 200, 'data': serialize(existing[kind][pk])}
+
+            if deleted[kind]:
+                Tombstone.objects.bulk_create([
+                    Tombstone(kind=kind, object_id=pk, deleted_at=now) for pk in deleted[kind]
+                ])
+                model.objects.filter(pk__in=list(deleted[kind])).delete()
+                unindex_objects(kind, model, deleted[kind])
+                for pk, index in deleted[kind].items():
+                    results[index] = {'status': 204, 'id': pk}
+
+    return JsonResponse({'success': True, 'results': results})
+
+@csrf_exempt
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def search(request):
+    """
+    Full-text search over task and note text. Takes `q`, an optional `type`
+    ("task" or "note") and `page`/`page_size`; returns ranked matches with
+    the matched words in the title and a snippet wrapped in <mark> tags.
+    """
+    data = _json_body(request)
+    if data is None:
+        return JsonResponse({'error': 'Request body must be a JSON object'}, status=400)
+    username = data.get('username')
+    password = data.get('password')
+
+    if username != HARD_CODED_USERNAME or password != HARD_CODED_PASSWORD:
+        return JsonResponse({'error': 'Invalid credentials'}, status=401)
+
+    query = (data.get('q') or '').strip()
+    if not query:
+        return JsonResponse({'error': 'Search query is required'}, status=400)
+
+    kind = data.get('type')
+    if kind is not None and kind not in SEARCH_TABLES:
+        return JsonResponse({'error': 'type must be task or note'}, status=400)
+    kinds = (kind,) if kind else tuple(SEARCH_TABLES)
+
+    try:
+        page = max(int(data.get('page', 1)), 1)
+        page_size = min(max(int(data.get('page_size', 20)), 1), 100)
+    except (TypeError, ValueError):
+        return JsonResponse({'error': 'page and page_size must be integers'}, status=400)
+
+    total, rows = search_todos(query, kinds, page, page_size)
+
+    # Attach current fields; rows for records deleted in bulk are dropped
+    ids = {kind: [pk for row_kind, pk, *_ in rows if row_kind == kind] for kind in kinds}
+    tasks = Task.objects.in_bulk(ids.get('task', []))
+    notes = Note.objects.in_bulk(ids.get('note', []))
+
+    results = []
+    for row_kind, pk, score, title, snippet in rows:
+        if row_kind == 'task' and pk in tasks:
+            item = _task_data(tasks[pk])
+        elif row_kind == 'note' and pk in notes:
+            item = _note_data(notes[pk])
+        else:
+            continue
+        item.update({
+            'type': row_kind,
+            'score': score,
+            'highlighted_title': title,
+            'snippet': snippet,
+        })
+        results.append(item)
+
+    return JsonResponse({
+        'success': True,
+        'total': total,
+        'page': page,
+        'page_size': page_size,
+        'results': results,
+    })
+
 @csrf_exempt
 @api_view(['POST'])
 @permission_classes([AllowAny])  # In production, restrict this!
@@ -104,8 +438,6 @@ def create_task(request):
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
-from dateutil import parser as date_parser  # Add this at the top
-
 @csrf_exempt
 @api_view(['PUT', 'DELETE'])
 @permission_classes([AllowAny])
@@ -121,7 +453,9 @@ def manage_task(request, task_id):
         task = Task.objects.get(id=task_id)
 
         if request.method == 'DELETE':
-            task.delete()
+            with transaction.atomic():
+                Tombstone.objects.create(kind='task', object_id=task.id)
+                task.delete()
             return JsonResponse({}, status=204)
 
         elif request.method == 'PUT':
@@ -146,8 +480,10 @@ def manage_task(request, task_id):
                 task.description = content
             if completed is not None:
                 task.completed = completed
-            if deadline:
+            if deadline and deadline != task.deadline:
                 task.deadline = deadline
+                # A moved deadline gets a fresh reminder
+                task.reminder_sent_at = None
             if status:
                 task.status = status
 
@@ -221,7 +557,9 @@ def manage_note(request, note_id):
         note = Note.objects.get(id=note_id)
 
         if request.method == "DELETE":
-            note.delete()
+            with transaction.atomic():
+                Tombstone.objects.create(kind="note", object_id=note.id)
+                note.delete()
             return JsonResponse({}, status=204)
 
         elif request.method == "PUT":
@@ -249,3 +587,61 @@ def manage_note(request, note_id):
         return JsonResponse({"error": "Note not found"}, status=404)
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
+
+
+@csrf_exempt
+@api_view(["POST"])
+@permission_classes([AllowAny])
+def note_revisions(request, note_id):
+    """List a note's saved revisions, newest first"""
+    data = _json_body(request)
+    if data is None:
+        return JsonResponse({"error": "Request body must be a JSON object"}, status=400)
+    username = data.get("username")
+    password = data.get("password")
+
+    if username != HARD_CODED_USERNAME or password != HARD_CODED_PASSWORD:
+        return JsonResponse({"error": "Invalid credentials"}, status=401)
+
+    if not Note.objects.filter(id=note_id).exists():
+        return JsonResponse({"error": "Note not found"}, status=404)
+
+    revisions = (
+        NoteRevision.objects.filter(note_id=note_id)
+        .order_by("-number")
+        .values("number", "title", "length", "is_snapshot", "created_at")
+    )
+    return JsonResponse({"success": True, "revisions": list(revisions)})
+
+
+@csrf_exempt
+@api_view(["POST"])
+@permission_classes([AllowAny])
+def note_revision(request, note_id, number):
+    """Return the title and content of one revision of a note"""
+    data = _json_body(request)
+    if data is None:
+        return JsonResponse({"error": "Request body must be a JSON object"}, status=400)
+    username = data.get("username")
+    password = data.get("password")
+
+    if username != HARD_CODED_USERNAME or password != HARD_CODED_PASSWORD:
+        return JsonResponse({"error": "Invalid credentials"}, status=401)
+
+    try:
+        revision = NoteRevision.objects.only("number", "title", "created_at").get(
+            note_id=note_id, number=number
+        )
+        content = revision_content(note_id, number)
+    except NoteRevision.DoesNotExist:
+        return JsonResponse({"error": "Revision not found"}, status=404)
+
+    return JsonResponse(
+        {
+            "note": note_id,
+            "number": revision.number,
+            "title": revision.title,
+            "content": content,
+            "created_at": revision.created_at,
+        }
+    )